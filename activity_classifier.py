@@ -0,0 +1,125 @@
+"""
+Offline activity-code classifier.
+
+Maps commit text to the record book's ACTIVITIES codes (see app.py) with a
+precomputed keyword index: stem -> (code, weight). A whole range is classified
+in one pass. Subjects are tokenised and stemmed column-wise, looked up in the
+index, and the weights are summed per (day, code). The top-scoring code wins.
+Days with no keyword signal get None, so the caller can fall back (to the
+LLM's code, or DEFAULT_CODE).
+"""
+import re
+
+import pandas as pd
+
+DEFAULT_CODE = "4.2"  # Program code
+# A day needs at least this much keyword weight before it moves off DEFAULT_CODE
+MIN_SCORE = 1.0
+
+# code -> {keyword: weight}. Keywords are stemmed with _stem() when the index is built.
+ACTIVITY_KEYWORDS = {
+    "1.1": {"research": 1.5, "spike": 2, "poc": 2, "prototype": 1.5, "explore": 1, "investigate": 1},
+    "1.2": {"feasibility": 2, "evaluate": 1, "evaluation": 1, "comparison": 1},
+    "2.1": {"analyze": 1.5, "analyse": 1.5, "analysis": 1.5, "audit": 1, "profiling": 1, "profile": 0.5},
+    "2.2": {"requirement": 2, "srs": 2, "story": 1, "acceptance": 1, "criteria": 1},
+    "3.1": {"schema": 1.5, "erd": 2, "dfd": 2, "migration": 1.5, "database": 1, "db": 1, "table": 0.5,
+            "entity": 1, "model": 0.5, "sql": 1, "prisma": 1, "orm": 1},
+    "3.2": {"design": 1.5, "architecture": 1.5, "diagram": 1.5, "wireframe": 2, "mockup": 2, "flowchart": 2,
+            "figma": 1.5, "ux": 1, "layout": 0.5},
+    "4.1": {"scaffold": 1.5, "skeleton": 1.5, "boilerplate": 1.5, "structure": 1, "interface": 0.5,
+            "init": 1, "initial": 1, "setup": 0.5},
+    "4.2": {"feat": 1, "feature": 1, "add": 0.5, "implement": 1, "create": 0.5, "build": 0.5,
+            "integrate": 0.5, "endpoint": 0.5, "component": 0.5, "page": 0.5},
+    "4.3": {"test": 2, "pytest": 2, "jest": 2, "unittest": 2, "spec": 1, "coverage": 1.5, "assert": 1,
+            "mock": 1, "fixture": 1},
+    "5.2": {"integration": 1.5, "e2e": 2.5, "cypress": 2.5, "playwright": 2.5, "selenium": 2.5},
+    "6.1": {"doc": 2, "docs": 2, "documentation": 2, "readme": 2, "guide": 1.5, "tutorial": 1.5,
+            "manual": 1, "training": 2, "onboarding": 1.5, "docstring": 1.5, "comment": 0.5},
+    "9.1": {"fix": 1.5, "bug": 2, "bugfix": 2, "hotfix": 2, "patch": 1, "crash": 1.5, "error": 1,
+            "issue": 0.5, "broken": 1, "typo": 1, "regression": 1.5, "refactor": 1, "cleanup": 1,
+            "lint": 1, "bump": 1, "upgrade": 1, "dependency": 1, "deprecate": 1, "maintenance": 2},
+    "12.1": {"release": 1.5, "changelog": 1.5, "milestone": 2, "roadmap": 2, "sprint": 2, "planning": 1.5,
+             "version": 0.5, "meeting": 1.5, "standup": 2},
+    "19.1": {"security": 2.5, "secure": 2, "vulnerability": 2.5, "cve": 2.5, "xss": 2.5, "csrf": 2.5,
+             "auth": 1.5, "authentication": 1.5, "authorization": 1.5, "oauth": 1.5, "jwt": 1.5,
+             "encrypt": 2, "encryption": 2, "password": 1.5, "secret": 1.5, "permission": 1, "sanitize": 2,
+             "rbac": 2, "2fa": 2, "mfa": 2},
+    "22.1": {"aws": 2.5, "azure": 2.5, "gcp": 2.5, "cloud": 2, "docker": 2, "dockerfile": 2, "kubernetes": 2.5,
+             "k8s": 2.5, "helm": 2, "terraform": 2.5, "lambda": 1.5, "s3": 2, "ec2": 2.5, "deploy": 1.5,
+             "deployment": 1.5, "ci": 1, "cd": 0.5, "pipeline": 1, "workflow": 0.5, "heroku": 2, "vercel": 2,
+             "netlify": 2, "firebase": 1.5, "serverless": 2, "nginx": 1.5},
+}
+
+_TOKEN = r"[a-z0-9][a-z0-9+#]*"
+_SUFFIX = re.compile(r"(?<=..)(?:ing|ed|es|s)$")
+# Dropped after the suffix so "feature"/"features" and "release"/"released" meet at the same stem
+_FINAL_E = re.compile(r"(?<=..)e$")
+
+
+def _stem(series):
+    return series.str.replace(_SUFFIX, "", regex=True).str.replace(_FINAL_E, "", regex=True)
+
+
+def _build_index():
+    rows = [(kw, code, w) for code, kws in ACTIVITY_KEYWORDS.items() for kw, w in kws.items()]
+    index = pd.DataFrame(rows, columns=["term", "code", "weight"])
+    index["term"] = _stem(index["term"])
+    # If two keywords stem to the same term, keep the stronger one
+    index = index.sort_values("weight", ascending=False).drop_duplicates("term")
+    return index.set_index("term")
+
+
+KEYWORD_INDEX = _build_index()
+
+
+def _token_frame(texts):
+    tokens = texts.astype(str).str.lower().str.findall(_TOKEN).explode().dropna()
+    # Vocabulary is tiny next to the token count: stem each distinct token once, then map
+    vocab = pd.Series(tokens.unique())
+    stems = dict(zip(vocab, _stem(vocab)))
+    return pd.DataFrame({"row": tokens.index, "term": tokens.map(stems).values})
+
+
+def score_texts(texts, groups=None):
+    """
+    Keyword scores per group (or per text) and code: DataFrame indexed by group, one column per code.
+    """
+    texts = pd.Series(texts).reset_index(drop=True)
+    tokens = _token_frame(texts)
+    hits = tokens.join(KEYWORD_INDEX, on="term", how="inner")
+    keys = pd.Series(groups).reset_index(drop=True) if groups is not None else texts.index.to_series()
+    hits["group"] = keys.reindex(hits["row"]).values
+    scores = hits.groupby(["group", "code"])["weight"].sum().unstack(fill_value=0.0)
+    return scores.reindex(pd.unique(keys), fill_value=0.0)
+
+
+def classify_texts(texts, groups=None, default=None):
+    """Best code per group (or per text); `default` where no code reaches MIN_SCORE."""
+    scores = score_texts(texts, groups)
+    if scores.empty or scores.shape[1] == 0:
+        # pd.Series(None, ...) would fill with NaN, which callers would read as a code
+        return pd.Series([default] * len(scores.index), index=scores.index, dtype=object)
+    best = scores.idxmax(axis=1).astype(object)
+    best[scores.max(axis=1) < MIN_SCORE] = default
+    return best
+
+
+def classify_days(commits_df, default=None):
+    """{date: code} for every day in commits_df (columns date, message), from all of that day's commits."""
+    if commits_df is None or commits_df.empty:
+        return {}
+    subjects = commits_df["message"].astype(str).str.split("\n", n=1).str[0]
+    return classify_texts(subjects.values, groups=commits_df["date"].values, default=default).to_dict()
+
+
+if __name__ == "__main__":
+    # Quick self-check: python activity_classifier.py
+    inflected = pd.Series(["features", "releases", "pipelines", "databases", "tables", "guides",
+                           "secured", "sanitized", "deprecated", "analyzed", "testing", "fixes"])
+    bases = pd.Series(["feature", "release", "pipeline", "database", "table", "guide",
+                       "secure", "sanitize", "deprecate", "analyze", "test", "fix"])
+    assert list(_stem(inflected)) == list(_stem(bases)), list(zip(_stem(inflected), _stem(bases)))
+    assert list(classify_texts(["Add new features", "Prepare releases", "Update guides"])) == ["4.2", "12.1", "6.1"]
+    no_signal = classify_days(pd.DataFrame({"date": ["2025-01-01", "2025-01-02"], "message": ["prepare", "wip"]}))
+    assert no_signal == {"2025-01-01": None, "2025-01-02": None}, no_signal
+    print("ok")
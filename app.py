@@ -2,14 +2,13 @@ import streamlit as st
 import pandas as pd
 import os
 from datetime import datetime, timedelta
-import openpyxl
-from openpyxl.styles import Alignment
-from io import BytesIO
 import time
-from groq import Groq
+import json
+import tracing # Stdlib only; spans/counters are no-ops outside a traced run
+# Heavy / feature-specific dependencies (groq, requests, openpyxl, dotenv) are
+# imported lazily inside the helpers below to keep cold start fast.
 
 # --- CONFIGURATION & DATA ---
-FILE_NAME = "my_placement_logs.csv"
 # Expanded list of activities based on your document
 ACTIVITIES = {
     "1.1": "Conduct preliminary investigations",
@@ -32,291 +31,61 @@ ACTIVITIES = {
 }
 
 # --- HELPER FUNCTIONS ---
-def load_data():
-    if not os.path.exists(FILE_NAME):
-        df = pd.DataFrame(columns=["Date", "Day", "Week_Ending", "Activity_Code", "Description", "Problems", "Solutions"])
-        df.to_csv(FILE_NAME, index=False)
-        return df
-    return pd.read_csv(FILE_NAME)
-
-def save_entry(date_obj, activity_code, desc, prob, sol):
-    df = load_data()
-    day_name = date_obj.strftime("%A")
-    # Logic: Week ends on the upcoming Sunday
-    days_ahead = 6 - date_obj.weekday()
-    week_ending = date_obj + timedelta(days=days_ahead)
-    
-    new_entry = {
-        "Date": date_obj,
-        "Day": day_name.upper(),
-        "Week_Ending": week_ending.strftime("%Y-%m-%d"),
-        "Activity_Code": activity_code,
-        "Description": desc,
-        "Problems": prob if prob else "",
-        "Solutions": sol if sol else ""
-    }
-    df = pd.concat([df, pd.DataFrame([new_entry])], ignore_index=True)
-    df.to_csv(FILE_NAME, index=False)
-    df.to_csv(FILE_NAME, index=False)
-    # st.success("Entry Saved!") # Removed to avoid clutter in bulk mode, handle in UI
-    
-def get_writeable_cell(ws, row, col):
-    """
-    Returns the writeable cell (top-left) if the target is a merged cell.
-    """
-    cell = ws.cell(row=row, column=col)
-    if isinstance(cell, openpyxl.cell.cell.MergedCell):
-        for merged_range in ws.merged_cells.ranges:
-            if (col >= merged_range.min_col and col <= merged_range.max_col and
-                row >= merged_range.min_row and row <= merged_range.max_row):
-                return ws.cell(row=merged_range.min_row, column=merged_range.min_col)
-    return cell
+# Log store (CSV with a (Date, Source) key index and upsert semantics)
+from log_store import FILE_NAME, load_data, save_entry, make_entry, upsert_entries
 
 def get_week_start(date_obj):
     """Returns the Monday of the week for the given date."""
     return date_obj - timedelta(days=date_obj.weekday())
 
-import copy
-
-def copy_range(ws, src_min_row, src_max_row, src_min_col, src_max_col, dest_min_row):
+def fallback_draft(day_commits):
+    """Bare offline draft for a day with no summary: just the repos worked on."""
+    repos = sorted({c["repo"] for c in day_commits})
+    return {"Project": ", ".join(repos), "Description": "Worked on " + (", ".join(repos) or "the project") + "."}
+
+def show_trace(trace, key):
+    """Collapsible metrics panel for the last traced run, with JSON / Chrome-trace export."""
+    with st.expander(f"⏱️ Run Metrics ({trace.name}, {trace.wall_s:.1f}s)"):
+        st.caption("Time per stage of the last run. Phases run one after another; spans (HTTP calls, sleeps, LLM calls) are nested inside them. Open the Chrome trace in chrome://tracing or ui.perfetto.dev.")
+        st.dataframe(pd.DataFrame(trace.phase_rows()), hide_index=True, use_container_width=True)
+        if trace.counters:
+            st.dataframe(pd.DataFrame(trace.counter_rows()), hide_index=True, use_container_width=True)
+        c_json, c_chrome = st.columns(2)
+        c_json.download_button("📥 Export JSON", trace.to_json(), file_name=f"{key}_trace.json",
+                               mime="application/json", key=f"{key}_trace_json")
+        c_chrome.download_button("📥 Export Chrome trace", trace.to_chrome_trace(), file_name=f"{key}_chrome_trace.json",
+                                 mime="application/json", key=f"{key}_trace_chrome")
+
+# --- SHARED RESOURCES (lazy, process-wide) ---
+@st.cache_resource
+def load_env():
+    """Loads .env once per process."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return True
+
+@st.cache_resource
+def get_http_session():
     """
-    Copies a range of cells (values + styles + merges) to a new row offset.
-    Returns the number of rows copied.
+    One requests.Session shared by every rerun and session.
+    Reuses TCP/TLS connections to api.github.com instead of reconnecting per call.
     """
-    rows_count = src_max_row - src_min_row + 1
-    dest_max_row = dest_min_row + rows_count - 1
-    dest_min_col = src_min_col
-    dest_max_col = src_max_col
-    
-    # 0. Cleanup Destination Merges
-    # If the destination has existing merges, we must unmerge them first to allow writing values.
-    # Otherwise we hit 'MergedCell' read-only errors.
-    for merged_range in list(ws.merged_cells.ranges):
-        # Check for overlap
-        if (merged_range.min_row <= dest_max_row and merged_range.max_row >= dest_min_row and
-            merged_range.min_col <= dest_max_col and merged_range.max_col >= dest_min_col):
-            try:
-                ws.unmerge_cells(start_row=merged_range.min_row, start_column=merged_range.min_col,
-                                 end_row=merged_range.max_row, end_column=merged_range.max_col)
-            except KeyError:
-                # Cell might be missing from internal index if rows were deleted beforehand
-                pass
-
-    # 1. Copy Cells
-    for row_offset in range(rows_count):
-        src_row = src_min_row + row_offset
-        dest_row = dest_min_row + row_offset
-        
-        for col in range(src_min_col, src_max_col + 1):
-            src_cell = ws.cell(row=src_row, column=col)
-            dest_cell = ws.cell(row=dest_row, column=col)
-            
-            # Copy value
-            dest_cell.value = src_cell.value
-            
-            # Copy style (simplified: alignment, font, border, fill)
-            if src_cell.has_style:
-                dest_cell.font = copy.copy(src_cell.font)
-                dest_cell.border = copy.copy(src_cell.border)
-                dest_cell.fill = copy.copy(src_cell.fill)
-                dest_cell.number_format = copy.copy(src_cell.number_format)
-                dest_cell.protection = copy.copy(src_cell.protection)
-                dest_cell.alignment = copy.copy(src_cell.alignment)
-
-    # 2. Copy Merged Cells
-    # We need to find merges in the source range and map them to the dest range
-    # Iterate over a COPY of the ranges because merge_cells modifies the collection
-    for merged_range in list(ws.merged_cells.ranges):
-        if (merged_range.min_row >= src_min_row and 
-            merged_range.max_row <= src_max_row and
-            merged_range.min_col >= src_min_col and 
-            merged_range.max_col <= src_max_col):
-            
-            # Calculate offset
-            offset_row = dest_min_row - src_min_row
-            
-            new_min_row = merged_range.min_row + offset_row
-            new_max_row = merged_range.max_row + offset_row
-            new_min_col = merged_range.min_col
-            new_max_col = merged_range.max_col
-            
-            ws.merge_cells(start_row=new_min_row, start_column=new_min_col, 
-                           end_row=new_max_row, end_column=new_max_col)
-            
-    return rows_count
-
-def fill_excel_sheet(template_file, data_df, start_date, end_date, output_path=None):
-    """
-    Refactored to:
-    1. Create one sheet per Month between start_date and end_date.
-    2. Dynamically generate 4 or 5 tables per sheet based on Sundays.
-    3. Fill tables with data for that month.
-    """
-    wb = openpyxl.load_workbook(template_file)
-    
-    # Identify Template Sheet
-    if 'Logs' in wb.sheetnames:
-        template_ws = wb['Logs']
-    else:
-        template_ws = wb.active
-        
-    template_ws.title = "Template" # Rename for clarity
-    
-    # --- 1. Identify Template Range ---
-    start_row = None
-    for row in range(1, 100):
-        c = template_ws.cell(row=row, column=1)
-        if c.value and "WEEK ENDING" in str(c.value).upper():
-            start_row = row
-            break
-            
-    if not start_row:
-        return None, "Could not find 'WEEK ENDING' in the template."
-
-    TEMPLATE_ROW_COUNT = 21 # Assumed block size
-    
-    # Convert dates
-    data_df['Week_Ending_Dt'] = pd.to_datetime(data_df['Week_Ending'])
-    
-    current_date = start_date.replace(day=1)
-    
-    # Iterate Months
-    while current_date <= end_date:
-        month_name = current_date.strftime("%b %Y")
-        
-        # Create new sheet from template
-        new_ws = wb.copy_worksheet(template_ws)
-        new_ws.title = month_name
-        
-        # --- CLEANUP: Keep only the first template block ---
-        # We assume the first block (start_row to +TEMPLATE_ROW_COUNT) is the master.
-        # Delete everything below it to avoid junk from the template file.
-        cutoff_row = start_row + TEMPLATE_ROW_COUNT
-        rows_to_delete = new_ws.max_row - cutoff_row + 10
-        if rows_to_delete > 0:
-            new_ws.delete_rows(cutoff_row, amount=rows_to_delete)
-        
-        # Get Sundays in this month
-        # Start from 1st of month
-        curr_mon = current_date
-        next_mon = (curr_mon.replace(day=28) + timedelta(days=4)).replace(day=1) # Advance to next month 1st
-        
-        # Find first Sunday
-        d = curr_mon
-        while d.weekday() != 6: # 6 = Sunday
-            d += timedelta(days=1)
-            
-        month_sundays = []
-        while d < next_mon:
-            month_sundays.append(d)
-            d += timedelta(days=7)
-            
-        # Target Sundays is ALL of them (4 or 5)
-        target_sundays = month_sundays
-        num_tables = len(target_sundays)
-        
-        # Determine table positions
-        tables_start_rows = []
-        for i in range(num_tables):
-            tables_start_rows.append(start_row + (TEMPLATE_ROW_COUNT + 1) * i)
-        
-        # Copy template to additional positions
-        # Note: Position 0 is already there (from the sheet copy).
-        # We copy for i=1 to N-1
-        for t_row in tables_start_rows[1:]:
-            copy_range(new_ws, start_row, start_row + TEMPLATE_ROW_COUNT - 1, 1, 20, t_row)
-        
-        # Fill Tables
-        day_map = {
-            "MONDAY": 2, "TUESDAY": 3, "WEDNESDAY": 4, 
-            "THURSDAY": 5, "FRIDAY": 6, "SATURDAY": 7, "SUNDAY": 8
-        }
-        
-        for idx, t_row in enumerate(tables_start_rows):
-            # Clear critical cells first (Date, Desc, Code, Probs) - in case Template had junk
-            # Date
-            c = get_writeable_cell(new_ws, t_row, 2)
-            if c: c.value = None
-            
-            # Prob/Sol
-            c = get_writeable_cell(new_ws, t_row + 10, 2)
-            if c: c.value = None
-            c = get_writeable_cell(new_ws, t_row + 10, 3)
-            if c: c.value = None
-            
-            # Days
-            for i in range(2, 9):
-                c = get_writeable_cell(new_ws, t_row + i, 2)
-                if c: c.value = None
-                c = get_writeable_cell(new_ws, t_row + i, 3)
-                if c: c.value = None
-
-            if idx < len(target_sundays):
-                week_dt = target_sundays[idx]
-                week_str = week_dt.strftime("%Y-%m-%d")
-                
-                # Fill Date
-                date_cell = get_writeable_cell(new_ws, t_row, 2)
-                if date_cell:
-                    date_cell.value = week_str
-                    date_cell.alignment = Alignment(horizontal='left')
-                
-                # Fill Data
-                week_data = data_df[data_df['Week_Ending'] == week_str]
-                if not week_data.empty:
-                    problems_list = []
-                    solutions_list = []
-                    for _, row_data in week_data.iterrows():
-                        day_offset = day_map.get(row_data['Day'], None)
-                        if day_offset:
-                            cell_desc = get_writeable_cell(new_ws, t_row + day_offset, 2)
-                            if cell_desc:
-                                # Append Project Name if available
-                                desc_text = row_data['Description']
-                                if 'Project' in row_data and pd.notna(row_data['Project']) and row_data['Project']:
-                                     desc_text = f"[{row_data['Project']}] {desc_text}"
-                                
-                                cell_desc.value = desc_text
-                                cell_desc.alignment = Alignment(wrap_text=True, vertical='top')
-
-                            cell_code = get_writeable_cell(new_ws, t_row + day_offset, 3)
-                            if cell_code:
-                                cell_code.value = row_data['Activity_Code']
-                                cell_code.alignment = Alignment(horizontal='center', vertical='top')
-                            
-                            if pd.notna(row_data['Problems']) and str(row_data['Problems']).strip():
-                                problems_list.append(str(row_data['Problems']))
-                            if pd.notna(row_data['Solutions']) and str(row_data['Solutions']).strip():
-                                solutions_list.append(str(row_data['Solutions']))
-
-                    if problems_list:
-                        cell = get_writeable_cell(new_ws, t_row + 10, 2)
-                        if cell:
-                            cell.value = "\n".join(problems_list)
-                            cell.alignment = Alignment(wrap_text=True, vertical='top')
-                    if solutions_list:
-                        cell = get_writeable_cell(new_ws, t_row + 10, 3)
-                        if cell:
-                            cell.value = "\n".join(solutions_list)
-                            cell.alignment = Alignment(wrap_text=True, vertical='top')
-
-        # Advance to next month
-        current_date = next_mon
-
-    # Move Template to end or hide it?
-    # Let's just delete it to be clean, as requested "created ... tabs"
-    if 'Template' in wb.sheetnames:
-        del wb['Template']
-
-    # Save
-    if output_path:
-        wb.save(output_path)
-        return None, "Saved directly to file."
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output, "Success"
+    import requests
+    session = requests.Session()
+    session.headers.update({"Accept": "application/vnd.github.v3+json"})
+    return session
+
+@st.cache_resource
+def get_groq_client(api_key):
+    """Groq client shared across reruns (one per API key)."""
+    from groq import Groq
+    return Groq(api_key=api_key)
+
+@st.cache_resource
+def get_model_router():
+    """Process-wide model router, so latency/429 telemetry survives reruns."""
+    from groq_router import ModelRouter
+    return ModelRouter()
 
 # --- GUI LAYOUT ---
 st.set_page_config(page_title="Placement Log Automator", page_icon="🚀", layout="wide")
@@ -330,13 +99,8 @@ df = load_data()
 # --- TABS ---
 tab_git, tab_daily, tab_manual, tab_excel, tab_hist = st.tabs(["🚀 Bulk Auto-Fill (Git)", "📝 Daily Log", "📚 Manual Weekly Fill", "🤖 Excel Automator", "📊 History"])
 
-import subprocess
-import requests
-import json
-from dotenv import load_dotenv
-
 # Load environment variables
-load_dotenv()
+load_env()
 
 # --- TAB 1: GITHUB IMPORT (MAIN) ---
 with tab_git:
@@ -357,44 +121,43 @@ with tab_git:
     # 2. Repo Selection
     st.subheader("Select Repositories")
     
+    import repo_catalog
+    catalog_account = f"{gh_username}|{'token' if gh_token else 'public'}"
+
     if "my_github_repos" not in st.session_state:
         st.session_state.my_github_repos = []
+        st.session_state.repo_catalog = None
+        st.session_state.repo_catalog_fetched_at = None
+        # Fresh on-disk catalogue -> selector is ready without any API call
+        cached_repos, catalog_age = repo_catalog.load_catalog(catalog_account)
+        if cached_repos:
+            st.session_state.repo_catalog = cached_repos
+            st.session_state.repo_catalog_fetched_at = time.time() - catalog_age
+            st.session_state.my_github_repos = sorted(r["full_name"] for r in cached_repos)
+            st.caption(f"📇 {len(cached_repos)} repositories loaded from the local catalogue (updated {int(catalog_age // 60)} min ago).")
 
     col_btn, col_manual = st.columns([1, 2])
     with col_btn:
         if st.button("🔄 Fetch Your Repositories"):
             try:
-                found_repos = []
-                page = 1
-                while True:
-                    if gh_token:
-                        # Authenticated: Get all accessible repos (private & public)
-                        url = "https://api.github.com/user/repos"
-                        headers = {"Authorization": f"token {gh_token}", "Accept": "application/vnd.github.v3+json"}
-                        params = {"per_page": 100, "page": page, "affiliation": "owner,collaborator,organization_member", "sort": "updated"}
-                    else:
-                        # Public only
-                        url = f"https://api.github.com/users/{gh_username}/repos"
-                        headers = {"Accept": "application/vnd.github.v3+json"}
-                        params = {"per_page": 100, "page": page, "sort": "updated"}
-                    
-                    resp = requests.get(url, headers=headers, params=params)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if not data:
-                            break # No more pages
-                        for r in data:
-                            found_repos.append(r["full_name"])
-                        page += 1
-                        # Safety break for massive accounts (limit to 300 for now)
-                        if page > 3: 
-                            break
-                    else:
-                        st.error(f"Error fetching repos: {resp.status_code} - {resp.text}")
-                        break
+                import github_api
+                headers = {"Accept": "application/vnd.github.v3+json"}
+                if gh_token:
+                    headers["Authorization"] = f"token {gh_token}"
+                # All pages (read from the Link header), fetched concurrently
+                trace = tracing.start("repo listing")
+                trace.phase("list repos")
+                try:
+                    found_repos = github_api.list_repos(get_http_session(), gh_username, headers,
+                                                        authenticated=bool(gh_token))
+                finally:
+                    st.session_state.git_trace = tracing.stop()
                 
                 if found_repos:
-                    st.session_state.my_github_repos = sorted(list(set(found_repos)))
+                    repo_catalog.save_catalog(catalog_account, found_repos)
+                    st.session_state.repo_catalog = found_repos
+                    st.session_state.repo_catalog_fetched_at = time.time()
+                    st.session_state.my_github_repos = sorted(r["full_name"] for r in found_repos)
                     st.success(f"Found {len(found_repos)} repositories!")
                 else:
                     st.warning("No repositories found.")
@@ -435,263 +198,193 @@ with tab_git:
         use_author_filter = st.checkbox(f"Filter by author: {gh_username}", value=True, help="Uncheck to see commits from everyone.")
 
 
-    data_source = st.radio("Data Source:", ["Fetch from GitHub", "Use Cached Data (fetched_commits.csv)"], horizontal=True)
+    data_source = st.radio("Data Source:", ["Fetch from GitHub", "Fast ingest (Search API)", "Use Cached Data"], horizontal=True,
+                           help="Fast ingest finds your commits across every repo with the commit search and events APIs, without selecting repositories. Needs GITHUB_USERNAME.")
+    fast_ingest = data_source.startswith("Fast ingest")
+    fetching = data_source != "Use Cached Data"
 
     if st.button("🚀 Fetch & Generate Logs"):
-        if not selected_repos:
+        if not selected_repos and not fast_ingest:
             st.error("Please select at least one repository.")
+        elif fast_ingest and not gh_username:
+            st.error("Fast ingest needs `GITHUB_USERNAME` in `.env`.")
         else:
-            headers = {"Accept": "application/vnd.github.v3+json"}
-            if gh_token:
-                headers["Authorization"] = f"token {gh_token}"
+            # Per-stage timings and counters for the metrics panel below
+            trace = tracing.start("git pipeline")
+            try:
+                trace.phase("setup")
+                headers = {"Accept": "application/vnd.github.v3+json"}
+                if gh_token:
+                    headers["Authorization"] = f"token {gh_token}"
             
-            all_commits = []
-            seen_shas = set() # To store unique commit SHAs
+                from commit_ingest import CommitBatcher, group_by_day
 
-            progress_bar = st.progress(0)
-            status_text = st.empty()
+                session = get_http_session()
+                batcher = CommitBatcher() # Columnar accumulator, de-duplicates by SHA in bulk
+                commits_df = None
+
+                progress_bar = st.progress(0)
+                status_text = st.empty()
             
-            total_repos = len(selected_repos)
+                total_repos = len(selected_repos)
             
-            for i, repo_name in enumerate(selected_repos):
-                 # Handle repo object if it's a dict or string (based on previous code it seemed to be a list of strings from multiselect)
-                repo = repo_name 
-
-                # Determine branches to scan
-                branches = []
-                if scan_all_branches and data_source.startswith("Fetch from"):
-                     status_text.text(f"Listing branches for {repo}...")
-                     # ... existing branch logic ...
-                if data_source.startswith("Fetch from"):
-                    if scan_all_branches:
-                        status_text.text(f"Listing branches for {repo}...")
-                        try:
-                            br_url = f"https://api.github.com/repos/{repo}/branches"
-                            br_resp = requests.get(br_url, headers=headers)
-                            if br_resp.status_code == 200:
-                                branches = [b["name"] for b in br_resp.json()]
-                            else:
-                                st.warning(f"Could not list branches for {repo}, defaulting to main.")
-                                branches = [None]
-                        except:
-                            branches = [None]
-                    else:
-                        branches = [None] # None means default branch
-
-                    for branch_name in branches:
-                        branch_label = branch_name if branch_name else "default"
-                        status_text.text(f"Fetching {repo} [{branch_label}]...")
-                        
+                import github_api
+                since = start_date.strftime('%Y-%m-%dT00:00:00Z')
+                until = (end_date + timedelta(days=1)).strftime('%Y-%m-%dT00:00:00Z')
+                # Apply Author Filter IF checkbox is checked
+                author = gh_username if (gh_username and use_author_filter) else None
+            
+                trace.phase("fetch commits")
+                inactive = []
+                # Repos whose commits in the range were fetched completely; only these replace cached rows
+                fetched_repos = []
+                if fast_ingest:
+                    # A few search/events calls instead of one listing per repo and branch
+                    try:
+                        fetched_repos = sorted(github_api.fast_ingest(session, batcher, gh_username, start_date, end_date,
+                                                                      all_branches=scan_all_branches, headers=headers,
+                                                                      warn=st.warning, status=status_text.text))
+                        st.info(f"⚡ Fast ingest found commits in {len(fetched_repos)} repo(s).")
+                    except Exception as e:
+                        st.error(f"Fast ingest failed: {e}")
+                        fetched_repos = []
+                    progress_bar.progress(1.0)
+                elif data_source.startswith("Fetch from"):
+                    # Repos with no pushes since the start date can't have commits in the range
+                    inactive = repo_catalog.inactive_repos(st.session_state.get("repo_catalog"), selected_repos, start_date)
+                    if inactive and not repo_catalog.covers_range(st.session_state.get("repo_catalog_fetched_at"), end_date):
+                        # The listing predates the end of the range: confirm the candidates haven't been pushed since
+                        status_text.text(f"Re-checking last push of {len(inactive)} repo(s)...")
+                        inactive = repo_catalog.inactive_repos(github_api.get_pushed_at(session, inactive, headers),
+                                                               inactive, start_date)
+                    tracing.count("repos_skipped_inactive", len(inactive))
+                    if inactive:
+                        st.info(f"⏭️ Skipping {len(inactive)} repo(s) with no pushes since {start_date}: {', '.join(inactive)}")
+
+                for i, repo in enumerate(selected_repos):
+                    if data_source.startswith("Fetch from"):
+                        if repo in inactive:
+                            fetched_repos.append(repo) # No pushes since the start date: nothing in the range
+                            progress_bar.progress((i + 1) / total_repos)
+                            continue
                         try:
-                            # Pagination Loop
-                            page = 1
-                            while True:
-                                url = f"https://api.github.com/repos/{repo}/commits"
-                                params = {
-                                    "since": start_date.strftime('%Y-%m-%dT00:00:00Z'),
-                                    "until": (end_date + timedelta(days=1)).strftime('%Y-%m-%dT00:00:00Z'),
-                                    "per_page": 50, # Reduced to 50 to avoid IncompleteRead on unstable connections
-                                    "page": page
-                                }
-                                # Apply Author Filter IF checkbox is checked
-                                if gh_username and use_author_filter:
-                                    params["author"] = gh_username
-                                    
-                                if branch_name:
-                                    params["sha"] = branch_name
-                                
-                                # Retry Logic for Network Instability
-                                resp = None
-                                for retry_attempt in range(3):
-                                    try:
-                                        resp = requests.get(url, headers=headers, params=params, timeout=30)
-                                        if resp.status_code == 200:
-                                            break # Success
-                                        elif resp.status_code not in [409, 500, 502, 503, 504]:
-                                            # If it's a client error (except timeouts/server errors), don't retry (e.g. 404, 401)
-                                            break
-                                    except Exception as e:
-                                        if retry_attempt == 2:
-                                            st.warning(f"Failed to fetch {repo} (Page {page}) after 3 attempts: {e}")
-                                        time.sleep(2) # Wait before retry
-                                
-                                if resp is None:
-                                    break # Failed all retries
-
-                                if resp.status_code == 200:
-                                    commits = resp.json()
-                                    if not commits:
-                                        break # No more commits
-                                    
-                                    for c in commits:
-                                        sha = c["sha"]
-                                        if sha in seen_shas:
-                                            continue # Skip duplicate
-                                        seen_shas.add(sha)
-                                        
-                                        commit_date_str = c["commit"]["author"]["date"]
-                                        dt_obj = datetime.strptime(commit_date_str, "%Y-%m-%dT%H:%M:%SZ")
-                                        date_only = dt_obj.strftime("%Y-%m-%d")
-                                        msg = c["commit"]["message"]
-                                        
-                                        all_commits.append({
-                                            "date": date_only,
-                                            "message": msg,
-                                            "repo": repo
-                                        })
-                                    
-                                    # Optimization: If fewer than 50 results, we reached end
-                                    if len(commits) < 50:
-                                        break
-                                    page += 1
-                                    # Limit pages to prevent infinite loops on massive repos
-                                    if page > 20: 
-                                        break
-                                        
-                                elif resp.status_code == 409:
-                                    break # Empty repo
-                                else:
-                                    st.warning(f"Failed {repo}/{branch_label}: {resp.status_code}")
-                                    break
-                                
+                            # Branches are grouped by head SHA; only commits not already fetched are downloaded
+                            if github_api.scan_repo(session, repo, batcher, since, until, author=author,
+                                                    all_branches=scan_all_branches, headers=headers,
+                                                    warn=st.warning, status=status_text.text):
+                                fetched_repos.append(repo)
                         except Exception as e:
                             st.error(f"Error fetching {repo}: {e}")
                 
-                    progress_bar.progress((i + 1) / total_repos)
+                        progress_bar.progress((i + 1) / total_repos)
 
-            # --- END OF REPO LOOP ---
+                # --- END OF REPO LOOP ---
+                trace.phase("build frame")
+                if fetching:
+                    commits_df = batcher.frame()
+                    tracing.count("commits_fetched", len(commits_df))
 
-            # Save to Cache if we fetched new data
-            if data_source.startswith("Fetch from") and all_commits:
-                try:
-                    df = pd.DataFrame(all_commits)
-                    df.to_csv("fetched_commits.csv", index=False)
-                    st.success(f"Saved {len(all_commits)} commits to 'fetched_commits.csv'")
-                except Exception as e:
-                    st.warning(f"Could not save cache: {e}")
-
-            # Load from Cache if selected
-            elif not data_source.startswith("Fetch from"):
-                try:
-                    if os.path.exists("fetched_commits.csv"):
-                        status_text.text("Loading from cache...")
-                        cached_df = pd.read_csv("fetched_commits.csv")
-                        
-                        # Ensure date column is datetime for proper filtering
-                        cached_df['date'] = pd.to_datetime(cached_df['date'])
-                        
-                        # Convert UI selection to datetime64 for comparison
-                        start_ts = pd.Timestamp(start_date)
-                        end_ts = pd.Timestamp(end_date)
-                        
-                        # Filter by selected date range
-                        mask = (cached_df['date'] >= start_ts) & (cached_df['date'] <= end_ts)
-                        filtered_df = cached_df.loc[mask]
-                        
-                        # Convert back to string for consistency with rest of app
-                        # (The 'date' column in all_commits is expected to be a string YYYY-MM-DD)
-                        filtered_df['date'] = filtered_df['date'].dt.strftime('%Y-%m-%d')
-                        
-                        all_commits = filtered_df.to_dict('records')
+                trace.phase("commit cache")
+
+                # Save to Cache if we fetched new data
+                if fetching and not commits_df.empty:
+                    try:
+                        import commit_cache
+                        complete = commits_df["repo"].isin(fetched_repos)
+                        commit_cache.save_commits(commits_df[complete], fetched_repos, start_date, end_date)
+                        # A failed or truncated repo keeps its cached range; its fresh rows are only added
+                        partial = sorted(set(commits_df.loc[~complete, "repo"]))
+                        if partial:
+                            commit_cache.append_commits(commits_df[~complete])
+                            st.warning(f"Fetch was incomplete for {', '.join(partial)}; kept their cached commits for this range.")
+                        st.success(f"Saved {len(commits_df)} commits to the local commit cache ('{commit_cache.CACHE_DIR}/')")
+                    except Exception as e:
+                        st.warning(f"Could not save cache: {e}")
+
+                # Load from Cache if selected
+                elif not fetching:
+                    try:
+                        import commit_cache
+                        if commit_cache.has_cache():
+                            status_text.text("Loading from cache...")
+                            # Only read the selected repos' partitions when they are actually cached
+                            cached_repos = set(commit_cache.list_cached_repos())
+                            repo_filter = [r for r in selected_repos if r in cached_repos] or None
+                            # Date/repo predicates are pushed down, so only matching partitions are read.
+                            # 'date' comes back as a YYYY-MM-DD string, as the rest of the app expects.
+                            commits_df = commit_cache.load_commits(start_date, end_date, repos=repo_filter)
                         
-                        st.info(f"Loaded {len(all_commits)} commits (Filtered from {len(cached_df)} in cache) based on range {start_date} to {end_date}.")
-                    else:
-                        st.error("fetched_commits.csv not found. Please fetch from GitHub first.")
-                except Exception as e:
-                    st.error(f"Error loading cache: {e}")
-
-            status_text.text("Processing logs...")
-            # Group by Date
-            commits_by_date = {}
-            for c in all_commits:
-                d = c["date"]
-                if d not in commits_by_date:
-                    commits_by_date[d] = []
-                commits_by_date[d].append(c)
+                            st.info(f"Loaded {len(commits_df)} commits (Filtered from {commit_cache.count_cached_commits()} in cache) based on range {start_date} to {end_date}.")
+                        else:
+                            st.error("No commit cache found. Please fetch from GitHub first.")
+                    except Exception as e:
+                        st.error(f"Error loading cache: {e}")
+
+                trace.phase("group by day")
+                status_text.text("Processing logs...")
+                # Group by Date (single sort + split)
+                commits_by_date = group_by_day(commits_df) if commits_df is not None else {}
             
-            # Summarize
-            if not commits_by_date:
-                st.warning("No unique commits found matching your criteria.")
-            else:
-                generated_logs = []
-                total_days = len(commits_by_date)
+                # Summarize
+                if not commits_by_date:
+                    st.warning("No unique commits found matching your criteria.")
+                else:
+                    generated_logs = []
+                    total_days = len(commits_by_date)
+
+                    # Offline extractive drafts for every day (no network, vectorized over the whole range).
+                    # Used directly without a Groq key, and as the fallback for days the LLM drops.
+                    trace.phase("offline drafts")
+                    from extractive_summarizer import summarize_days
+                    offline_drafts = {row["Date"]: row for row in summarize_days(commits_df).to_dict("records")}
+                    # Activity code per day from a local keyword index (None = no clear signal)
+                    trace.phase("classify")
+                    from activity_classifier import classify_days, DEFAULT_CODE
+                    # Only days with a clear signal, so `day_codes.get(d) or fallback` below falls through otherwise
+                    day_codes = {d: c for d, c in classify_days(commits_df).items() if pd.notna(c)}
                 
-                gen_progress = st.progress(0, text="Summarizing with AI..." if groq_api_key else "Summarizing...")
+                    gen_progress = st.progress(0, text="Summarizing with AI..." if groq_api_key else "Summarizing...")
                 
 
-                # Initialize Groq Client
-                groq_client = None
-                if groq_api_key:
-                    try:
-                        groq_client = Groq(api_key=groq_api_key)
-                    except Exception as e:
-                        st.error(f"Groq Init Error: {e}")
-
-                def make_groq_request(client, prompt, retries=3):
-                    """
-                    Tries to get a completion with exponential backoff and model fallback.
-                    Models: llama-3.1-8b-instant -> llama-3.3-70b-versatile
-                    """
-                    # Swapped order: 8b is faster and often has better rate limits
-                    models = ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"]
-                    
-                    for model in models:
-                        for attempt in range(retries):
-                            try:
-                                return client.chat.completions.create(
-                                    model=model,
-                                    messages=[{"role": "user", "content": prompt}],
-                                    temperature=0.3,
-                                    max_tokens=6000, # More tokens for batch response
-                                    response_format={"type": "json_object"} # STRICT JSON MODE
-                                )
-                            except Exception as e:
-                                # Check for Rate Limit (429)
-                                is_rate_limit = "429" in str(e) or (hasattr(e, 'status_code') and e.status_code == 429)
-                                
-                                if is_rate_limit:
-                                    wait_time = 2 ** (attempt + 1) # 2, 4, 8 seconds
-                                    if attempt < retries - 1:
-                                        print(f"Rate limit on {model}. Retrying in {wait_time}s...")
-                                        time.sleep(wait_time)
-                                    else:
-                                        print(f"Giving up on {model} after {retries} attempts.")
-                                else:
-                                    print(f"Error on {model}: {e}")
-                                    break # Try next model immediately
-                                    
-                    return None # All failed
+                    trace.phase("summarize")
+                    # Initialize Groq Client
+                    groq_client = None
+                    if groq_api_key:
+                        try:
+                            groq_client = get_groq_client(groq_api_key)
+                        except Exception as e:
+                            st.error(f"Groq Init Error: {e}")
 
-                # Prepare batches
-                sorted_dates = sorted(commits_by_date.keys(), reverse=True)
-                BATCH_SIZE = 3 
-                batches = [sorted_dates[i:i + BATCH_SIZE] for i in range(0, len(sorted_dates), BATCH_SIZE)]
+                    # Prepare batches
+                    sorted_dates = sorted(commits_by_date.keys(), reverse=True)
+                    BATCH_SIZE = 3 
+                    batches = [sorted_dates[i:i + BATCH_SIZE] for i in range(0, len(sorted_dates), BATCH_SIZE)]
                 
-                total_batches = len(batches)
+                    total_batches = len(batches)
+                    compaction_stats = []
                 
-                for b_idx, batch_dates in enumerate(batches):
-                    # Construct Prompt for the entire batch
-                    batch_context = []
-                    for d_str in batch_dates:
-                        commits = commits_by_date[d_str]
-                        # Include Repo Name in the prompt data so AI knows the context
-                        msgs_with_repo = [f"[{c['repo']}] {c['message']}" for c in commits]
-                        batch_context.append(f"Date: {d_str}\nCommits:\n" + "\n".join(f"- {m}" for m in msgs_with_repo))
-                    
-                    full_batch_text = "\n\n".join(batch_context)
-                    
-                    if groq_client:
-                        # Keep strict delay for safety, can reduce later if 8b proves robust
-                        if b_idx > 0:
-                            status_text.text(f"⏳ Throttling for 5s (Model Switch) to respect Rate Limits...")
-                            time.sleep(5) # Reduced to 5s as 8b is generally lighter
-                            status_text.text(f"Processing Batch {b_idx+1}/{total_batches}...")
+                    for b_idx, batch_dates in enumerate(batches):
+                        if groq_client:
+                            # Construct Prompt for the entire batch.
+                            # Compaction drops merges/bot commits, collapses near-duplicates,
+                            # truncates bodies and writes each repo once under a short alias.
+                            from prompt_compaction import compact_batch
+                            with tracing.span("compact prompt"):
+                                full_batch_text, _, batch_stats = compact_batch(commits_by_date, batch_dates)
+                            compaction_stats.extend(batch_stats)
+
+                            # Keep strict delay for safety, can reduce later if 8b proves robust
+                            if b_idx > 0:
+                                status_text.text(f"⏳ Throttling for 5s (Model Switch) to respect Rate Limits...")
+                                with tracing.span("throttle sleep"):
+                                    time.sleep(5) # Reduced to 5s as 8b is generally lighter
+                                status_text.text(f"Processing Batch {b_idx+1}/{total_batches}...")
                             
-                        prompt = f"""Role: Software engineer writing a daily work log.
+                            prompt = f"""Role: Software engineer writing a daily work log.
 
 Task:
 For each date below, write a natural, human-like summary of EVERYTHING done that day (max 50 words).
-The Activity should cite the Project/App name (found in brackets [Owner/Repo]) naturally.
+The Activity should cite the Project/App name (found in brackets [project], commits listed below it) naturally.
 Style: First-person, narrative style (e.g., "I implemented the login for [Project] and fixed bugs...").
 Output must be a valid JSON Object with a key "entries" containing the list.
 
@@ -711,62 +404,104 @@ Output JSON Format:
     ]
 }}
 """
-                        try:
-                            response = make_groq_request(groq_client, prompt)
+                            try:
+                                # Picks the model from rolling latency/429/JSON telemetry, hedges slow calls
+                                router = get_model_router()
+                                response, used_model = router.request(groq_client, prompt)
                             
-                            if response:
-                                text = response.choices[0].message.content
-                                try:
-                                    # With strict JSON mode, we should just load it directly
-                                    data = json.loads(text)
-                                    data_list = data.get("entries", [])
+                                if response:
+                                    text = response.choices[0].message.content
+                                    try:
+                                        # With strict JSON mode, we should just load it directly
+                                        with tracing.span("parse JSON"):
+                                            data = json.loads(text)
+                                        router.record_json_result(used_model, True)
+                                        data_list = data.get("entries", [])
                                     
-                                    # Map back to results
-                                    for item in data_list:
-                                        # Validate date exists in our batch
-                                        log_date = item.get("date")
-                                        if log_date in batch_dates:
-                                            # Extract Project/Repo Name(s) for this date
-                                            date_commits = commits_by_date.get(log_date, [])
-                                            unique_repos = sorted(list(set(c["repo"] for c in date_commits)))
-                                            project_name = ", ".join(unique_repos)
-
-                                            generated_logs.append({
-                                                "Date": log_date,
-                                                "Project": project_name,
-                                                "Activity": item.get("activity_code", "4.2"),
-                                                "Description": item.get("description", ""),
-                                                "Problems": item.get("problem", ""),
-                                                "Solutions": item.get("solution", "")
-                                            })
-                                except json.JSONDecodeError:
-                                    st.warning(f"⚠️ JSON Parse Error for batch {b_idx+1}. Raw: {text[:100]}...")
-                            else:
-                                st.error(f"❌ Batch {b_idx+1} failed after retries.")
+                                        # Map back to results
+                                        for item in data_list:
+                                            # Validate date exists in our batch
+                                            log_date = item.get("date")
+                                            if log_date in batch_dates:
+                                                # Extract Project/Repo Name(s) for this date
+                                                date_commits = commits_by_date.get(log_date, [])
+                                                unique_repos = sorted(list(set(c["repo"] for c in date_commits)))
+                                                project_name = ", ".join(unique_repos)
+
+                                                generated_logs.append({
+                                                    "Date": log_date,
+                                                    "Project": project_name,
+                                                    "Activity": day_codes.get(log_date) or (item.get("activity_code") if item.get("activity_code") in ACTIVITIES else DEFAULT_CODE),
+                                                    "Description": item.get("description", ""),
+                                                    "Problems": item.get("problem", ""),
+                                                    "Solutions": item.get("solution", "")
+                                                })
+                                    except json.JSONDecodeError:
+                                        router.record_json_result(used_model, False)
+                                        st.warning(f"⚠️ JSON Parse Error for batch {b_idx+1}. Raw: {text[:100]}...")
+                                else:
+                                    st.error(f"❌ Batch {b_idx+1} failed after retries.")
                                 
-                        except Exception as e:
-                            st.warning(f"⚠️ Batch Error: {e}")
-
-                    else:
-                        # Fallback if no Groq Key (Manual fill)
-                        for d_str in batch_dates:
-                            commits = commits_by_date[d_str]
-                            msgs = [c["message"] for c in commits]
-                            repo_text = ", ".join(list(set([c["repo"] for c in commits])))
-                            generated_logs.append({
-                                "Date": d_str,
-                                "Activity": "4.2",
-                                "Description": f"Worked on {repo_text}. Commits: {msgs[0]}",
-                                "Problems": "",
-                                "Solutions": ""
-                            })
-
-                    # Update Progress
-                    gen_progress.progress((b_idx + 1) / total_batches)
-
-                generated_logs.sort(key=lambda x: x["Date"])
-                st.session_state.generated_git_logs = pd.DataFrame(generated_logs)
-                st.success(f"✅ Generated {len(generated_logs)} entries via GitHub API!")
+                            except Exception as e:
+                                st.warning(f"⚠️ Batch Error: {e}")
+
+                        else:
+                            # Fallback if no Groq Key: offline extractive summary
+                            for d_str in batch_dates:
+                                draft = offline_drafts.get(d_str) or fallback_draft(commits_by_date.get(d_str, []))
+                                generated_logs.append({
+                                    "Date": d_str,
+                                    "Project": draft["Project"],
+                                    "Activity": day_codes.get(d_str) or DEFAULT_CODE,
+                                    "Description": draft["Description"],
+                                    "Problems": "",
+                                    "Solutions": ""
+                                })
+
+                        # Update Progress
+                        gen_progress.progress((b_idx + 1) / total_batches)
+
+                    trace.phase("finalize")
+                    # Days the LLM skipped or failed on keep their offline draft instead of disappearing
+                    covered = {log["Date"] for log in generated_logs}
+                    missing = [d for d in sorted_dates if d not in covered]
+                    for d_str in missing:
+                        draft = offline_drafts.get(d_str) or fallback_draft(commits_by_date.get(d_str, []))
+                        generated_logs.append({
+                            "Date": d_str,
+                            "Project": draft["Project"],
+                            "Activity": day_codes.get(d_str) or DEFAULT_CODE,
+                            "Description": draft["Description"],
+                            "Problems": "",
+                            "Solutions": ""
+                        })
+                    if groq_client and missing:
+                        st.info(f"ℹ️ {len(missing)} day(s) used the offline summary because the AI returned nothing for them.")
+
+                    if compaction_stats:
+                        stats_df = pd.DataFrame(compaction_stats).sort_values("date")
+                        stats_df["tokens_saved"] = stats_df["tokens_before"] - stats_df["tokens_after"]
+                        before, saved = stats_df["tokens_before"].sum(), stats_df["tokens_saved"].sum()
+                        st.caption(f"✂️ Prompt compaction saved ~{saved:,} of {before:,} input tokens ({saved / max(before, 1):.0%}).")
+                        with st.expander("Prompt compaction per day"):
+                            st.dataframe(stats_df, hide_index=True, use_container_width=True)
+
+                    generated_logs.sort(key=lambda x: x["Date"])
+                    st.session_state.generated_git_logs = pd.DataFrame(generated_logs)
+                    st.success(f"✅ Generated {len(generated_logs)} entries via GitHub API!")
+
+            finally:
+                # Keep the partial trace even when a stage raises
+                st.session_state.git_trace = tracing.stop()
+
+    # Model telemetry (rolling, shared across sessions)
+    if groq_api_key:
+        with st.expander("📈 Model Telemetry (Groq routing)"):
+            st.caption("Rolling stats over the last calls per model. The router tries the best-scoring model first and hedges calls that run past its p95.")
+            st.dataframe(pd.DataFrame(get_model_router().metrics_rows()), hide_index=True, use_container_width=True)
+
+    if st.session_state.get("git_trace"):
+        show_trace(st.session_state.git_trace, "git")
 
     # 4. Preview & Save (Same as before)
     if "generated_git_logs" in st.session_state and not st.session_state.generated_git_logs.empty:
@@ -774,18 +509,27 @@ Output JSON Format:
         edited_logs = st.data_editor(st.session_state.generated_git_logs, num_rows="dynamic")
         
         if st.button("💾 Save All Imported Logs"):
-            count = 0
+            from activity_classifier import classify_texts, DEFAULT_CODE
+            # Keep the (possibly edited) code; classify the description where it is blank or unknown
+            codes = edited_logs["Activity"].where(edited_logs["Activity"].isin(list(ACTIVITIES)), None)
+            if codes.isna().any():
+                guessed = classify_texts(edited_logs["Description"].fillna("").values, default=DEFAULT_CODE)
+                codes = codes.fillna(pd.Series(guessed.values, index=codes.index))
+            new_entries = []
             for index, row in edited_logs.iterrows():
-                save_entry(
+                new_entries.append(make_entry(
                     datetime.strptime(row["Date"], "%Y-%m-%d"), 
-                    "1.1", 
+                    codes[index], 
                     row["Description"], 
                     row["Problems"], 
-                    row["Solutions"]
-                )
-                count += 1
+                    row["Solutions"],
+                    project=row.get("Project", ""),
+                    source="git"
+                ))
+            # One write; re-importing a day replaces its earlier Git row instead of duplicating it
+            inserted, updated = upsert_entries(new_entries)
             
-            st.success(f"Successfully imported {count} logs!")
+            st.success(f"Successfully imported {inserted + updated} logs! ({inserted} new, {updated} replaced)")
             st.session_state.generated_git_logs = pd.DataFrame()
             time.sleep(2)
             st.rerun()
@@ -800,6 +544,10 @@ with tab_daily:
     
     # Key suffix for resetting
     daily_key = str(st.session_state.daily_form_key)
+
+    # Shown once, after the save's rerun
+    if st.session_state.get("daily_notice"):
+        st.warning("♻️ " + st.session_state.pop("daily_notice"))
     
     with st.form("daily_entry_form"):
         col1, col2 = st.columns(2)
@@ -826,9 +574,12 @@ with tab_daily:
             if description.strip():
                 with st.spinner("Saving entry..."):
                     code = activity_code # activity_code is already the code, no split needed
-                    save_entry(date_entry, code, description, prob, sol)
+                    _, replaced = save_entry(date_entry, code, description, prob, sol, source="daily")
                     time.sleep(0.5) # Fake delay for UX
                 
+                if replaced:
+                    # Entries are keyed by (Date, Source): saving a day again overwrites its Daily Log entry
+                    st.session_state.daily_notice = f"Replaced the existing Daily Log entry for {date_entry}."
                 st.success("✅ Entry Saved! Clearing form...")
                 time.sleep(1)
                 st.session_state.daily_form_key += 1
@@ -837,8 +588,6 @@ with tab_daily:
                 st.error("⚠️ Description required!")
 
 
-import time
-
 # --- TAB 3: MANUAL BULK ENTRY ---
 with tab_manual:
     st.header("📚 Bulk Week Entry")
@@ -847,6 +596,8 @@ with tab_manual:
     # Initialize session state for form reset
     if "bulk_form_key" not in st.session_state:
         st.session_state.bulk_form_key = 0
+    if st.session_state.get("bulk_notice"):
+        st.warning("♻️ " + st.session_state.pop("bulk_notice"))
 
     import calendar
 
@@ -936,18 +687,23 @@ with tab_manual:
         submitted = st.form_submit_button("💾 Save Full Week Logs")
         if submitted:
             with st.spinner("Saving entries..."):
-                count = 0
+                week_entries = []
                 for entry in entries:
                     if entry["description"].strip():
                         code = entry["activity"].split(" - ")[0]
-                        save_entry(
+                        week_entries.append(make_entry(
                             entry["date"], 
                             code, 
                             entry["description"], 
                             entry["problem"], 
-                            entry["solution"]
-                        )
-                        count += 1
+                            entry["solution"],
+                            source="weekly"
+                        ))
+                count = len(week_entries)
+                if week_entries:
+                    _, replaced = upsert_entries(week_entries)
+                    if replaced:
+                        st.session_state.bulk_notice = f"Replaced {replaced} existing Weekly Fill entr{'ies' if replaced > 1 else 'y'} for this week."
                 
                 time.sleep(0.5) # Fake delay for UX feel
 
@@ -986,6 +742,8 @@ with tab_excel:
     if final_file and not df.empty:
         if st.button("⚡ Fill Excel Sheet"):
             with st.spinner("Processing..."):
+                from record_book import fill_excel_sheet # Lazy: pulls in openpyxl
+
                 # If using the local file directly, output to the same path
                 save_path = local_file_name if (final_file == local_file_name) else None
                 
@@ -993,7 +751,11 @@ with tab_excel:
                 start_dt = datetime.combine(gen_start_date, datetime.min.time())
                 end_dt = datetime.combine(gen_end_date, datetime.min.time())
 
-                processed_excel, msg = fill_excel_sheet(final_file, df, start_dt, end_dt, output_path=save_path)
+                tracing.start("excel fill")
+                try:
+                    processed_excel, msg = fill_excel_sheet(final_file, df, start_dt, end_dt, output_path=save_path)
+                finally:
+                    st.session_state.excel_trace = tracing.stop()
                 
                 if save_path and processed_excel is None:
                     # Direct save case
@@ -1013,12 +775,77 @@ with tab_excel:
     elif df.empty:
         st.warning("No logs found! Go to the 'Daily Log' tab and add some entries first.")
 
+    if st.session_state.get("excel_trace"):
+        show_trace(st.session_state.excel_trace, "excel")
+
 # --- TAB 5: HISTORY ---
 with tab_hist:
     if not df.empty:
         # Check if Date column exists before sorting
         if "Date" in df.columns:
-            st.dataframe(df.sort_values(by="Date", ascending=False), use_container_width=True)
+            # Filters and paging run against the store (log_store.query_logs); only one page goes to the browser
+            import log_store
+
+            # Same date logged from more than one source: the Excel fill would keep only one of them
+            conflicts = log_store.conflict_summary()
+            if conflicts["dates"]:
+                st.warning(f"⚠️ {conflicts['dates']} date(s) have more than one entry ({conflicts['rows']} rows, e.g. Git import + Daily Log). "
+                           "Only one will appear in the Excel record book. Tick 'Only conflicting entries' below to review them.")
+            options = log_store.filter_options()
+            view = st.radio("View", ["Entries", "Weekly summary", "Monthly summary"], horizontal=True)
+
+            f_dates, f_weeks = st.columns(2)
+            with f_dates:
+                if options["first_day"]:
+                    date_range = st.date_input("Date range", value=(options["first_day"], options["last_day"]),
+                                               min_value=options["first_day"], max_value=options["last_day"])
+                else:
+                    date_range = () # No parsable dates in the store
+            range_start = date_range[0] if len(date_range) > 0 else None
+            range_end = date_range[1] if len(date_range) > 1 else None
+
+            if view == "Entries":
+                with f_weeks:
+                    hist_weeks = st.multiselect("Week ending", options["weeks"])
+                f_codes, f_projects, f_sources = st.columns(3)
+                with f_codes:
+                    hist_codes = st.multiselect("Activity", options["codes"],
+                                                format_func=lambda c: f"{c} - {ACTIVITIES.get(c, '?')}")
+                with f_projects:
+                    hist_projects = st.multiselect("Project", options["projects"])
+                with f_sources:
+                    hist_sources = st.multiselect("Source", options["sources"], format_func=lambda s: s or "(not recorded)")
+
+                hist_conflicts = st.checkbox("Only conflicting entries", disabled=not conflicts["dates"])
+
+                filters = dict(start=range_start, end=range_end, weeks=hist_weeks, codes=hist_codes,
+                               projects=hist_projects, sources=hist_sources, conflicts_only=hist_conflicts)
+                c_page, c_size, c_order = st.columns(3)
+                with c_size:
+                    page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+                with c_order:
+                    oldest_first = st.toggle("Oldest first", value=False)
+                with c_page:
+                    # Keyed on the filters so changing them goes back to page 1
+                    page = st.number_input("Page", min_value=1, value=1, step=1,
+                                           key=f"hist_page_{hash(repr(filters))}_{page_size}")
+
+                page_df, total = log_store.query_logs(**filters, page=page, page_size=page_size, ascending=oldest_first)
+                last_page = max(1, -(-total // page_size))
+                st.caption(f"{total:,} matching entries · page {min(page, last_page)} of {last_page}")
+                st.dataframe(page_df, use_container_width=True, hide_index=True)
+            else:
+                summary = log_store.week_summary() if view == "Weekly summary" else log_store.month_summary()
+                key_col = "Week_Ending" if view == "Weekly summary" else "Month"
+                # Aggregates are precomputed per store version; only the date range is applied here
+                lo = range_start.strftime("%Y-%m-%d" if key_col == "Week_Ending" else "%Y-%m") if range_start else ""
+                hi = range_end.strftime("%Y-%m-%d" if key_col == "Week_Ending" else "%Y-%m") if range_end else "~"
+                if key_col == "Week_Ending" and range_end:
+                    # A week ending up to 6 days after the range end still overlaps it
+                    hi = (range_end + timedelta(days=6)).strftime("%Y-%m-%d")
+                summary = summary[(summary[key_col] >= lo) & (summary[key_col] <= hi)]
+                st.caption(f"{len(summary):,} {'weeks' if key_col == 'Week_Ending' else 'months'}")
+                st.dataframe(summary, use_container_width=True, hide_index=True)
         else:
             st.dataframe(df, use_container_width=True)
             st.warning("Date column missing from logs.")
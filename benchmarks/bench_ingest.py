@@ -0,0 +1,106 @@
+"""
+Commit ingestion benchmark: the old per-commit loop vs commit_ingest.
+
+Generates synthetic /commits pages (50 commits each, ~10% duplicate SHAs as
+when branches overlap) and times page ingestion + de-duplication + grouping
+by day at several commit volumes.
+
+Usage:
+    python benchmarks/bench_ingest.py [--sizes 10000 100000 300000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commit_ingest import CommitBatcher, group_by_day  # noqa: E402
+
+PAGE_SIZE = 50
+
+
+def make_pages(n_commits, n_repos=10, dup_ratio=0.1, seed=0):
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    unique = int(n_commits * (1 - dup_ratio))
+    pool = []
+    for i in range(unique):
+        dt = base + timedelta(seconds=rng.randrange(2 * 365 * 86400))
+        pool.append({
+            "sha": f"{i:040x}",
+            "commit": {
+                "author": {"date": dt.strftime("%Y-%m-%dT%H:%M:%SZ")},
+                "message": f"Fix issue #{i}\n\nLonger body text for commit {i}.",
+            },
+        })
+    commits = pool + [rng.choice(pool) for _ in range(n_commits - unique)]
+    pages = []
+    for start in range(0, len(commits), PAGE_SIZE):
+        pages.append((f"owner/repo-{(start // PAGE_SIZE) % n_repos}", commits[start:start + PAGE_SIZE]))
+    return pages
+
+
+def legacy_ingest(pages):
+    """The loop app.py used before commit_ingest (kept here as the baseline)."""
+    all_commits = []
+    seen_shas = set()
+    for repo, commits in pages:
+        for c in commits:
+            sha = c["sha"]
+            if sha in seen_shas:
+                continue
+            seen_shas.add(sha)
+            dt_obj = datetime.strptime(c["commit"]["author"]["date"], "%Y-%m-%dT%H:%M:%SZ")
+            all_commits.append({
+                "date": dt_obj.strftime("%Y-%m-%d"),
+                "message": c["commit"]["message"],
+                "repo": repo,
+            })
+    commits_by_date = {}
+    for c in all_commits:
+        d = c["date"]
+        if d not in commits_by_date:
+            commits_by_date[d] = []
+        commits_by_date[d].append(c)
+    return commits_by_date
+
+
+def columnar_ingest(pages):
+    batcher = CommitBatcher()
+    for repo, commits in pages:
+        batcher.add_page(commits, repo)
+    return group_by_day(batcher.frame())
+
+
+def best_of(fn, arg, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'commits':>10} {'legacy s':>10} {'columnar s':>11} {'speedup':>8} {'commits/s (columnar)':>21}")
+    for n in args.sizes:
+        pages = make_pages(n)
+        t_old, old = best_of(legacy_ingest, pages, args.repeat)
+        t_new, new = best_of(columnar_ingest, pages, args.repeat)
+
+        # Same days and same number of commits per day
+        assert {d: len(v) for d, v in old.items()} == {d: len(v) for d, v in new.items()}
+        print(f"{n:>10} {t_old:>10.3f} {t_new:>11.3f} {t_old / t_new:>7.1f}x {n / t_new:>21,.0f}")
+
+
+if __name__ == "__main__":
+    main()
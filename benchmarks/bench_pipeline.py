@@ -0,0 +1,130 @@
+"""
+End-to-end load test of the Git tab pipeline against stub_server.py (no network).
+
+Starts a synthetic stub in-process, then runs what "Fetch & Generate" does:
+list repos -> scan every repo -> group by day -> compact + summarize each
+3-day batch through the model router. The app's fixed 5s pause between
+batches is left out, since it only exists to respect Groq's real limits.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--repos 20] [--commits 500] [--latency-ms 30]
+        [--error-rate 0.02] [--throttle-rate 0.02] [--max-batches 20] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stub_server  # noqa: E402
+
+BATCH_SIZE = 3 # Same as app.py
+
+
+def run(args):
+    faults = stub_server.FaultPlan(args.seed, args.latency_ms, args.jitter_ms, args.error_rate,
+                                   args.throttle_rate, args.rate_limit, args.window_s)
+    server = stub_server.make_server("synthetic", port=0, faults=faults, repos=args.repos,
+                                     commits=args.commits, start=args.start, end=args.end)
+    base_url = stub_server.start_in_thread(server)
+
+    # github_api reads GITHUB_API_URL at import time
+    os.environ["GITHUB_API_URL"] = base_url
+    import requests
+    from groq import Groq
+    import github_api
+    from commit_ingest import CommitBatcher, group_by_day
+    from prompt_compaction import compact_batch
+    from groq_router import ModelRouter
+
+    session = requests.Session()
+    session.headers.update({"Accept": "application/vnd.github.v3+json"})
+    timings = {}
+
+    t0 = time.perf_counter()
+    repos = github_api.list_repos(session, authenticated=True)
+    timings["list_repos_s"] = time.perf_counter() - t0
+
+    warnings = []
+    batcher = CommitBatcher()
+    since, until = f"{args.start}T00:00:00Z", f"{args.end}T23:59:59Z"
+    t0 = time.perf_counter()
+    for r in repos:
+        github_api.scan_repo(session, r["full_name"], batcher, since, until, author=stub_server.SYNTH_USER,
+                             warn=warnings.append)
+    timings["fetch_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    commits_df = batcher.frame()
+    commits_by_date = group_by_day(commits_df)
+    timings["group_s"] = time.perf_counter() - t0
+
+    client = Groq(api_key="stub", base_url=base_url)
+    router = ModelRouter()
+    dates = sorted(commits_by_date, reverse=True)
+    batches = [dates[i:i + BATCH_SIZE] for i in range(0, len(dates), BATCH_SIZE)][:args.max_batches]
+    summarized = failed = 0
+    t0 = time.perf_counter()
+    for batch_dates in batches:
+        text, _, _ = compact_batch(commits_by_date, batch_dates)
+        response, model = router.request(client, f"Input Data:\n{text}\n")
+        if response is None:
+            failed += 1
+            continue
+        entries = json.loads(response.choices[0].message.content).get("entries", [])
+        router.record_json_result(model, True)
+        summarized += len(entries)
+    timings["summarize_s"] = time.perf_counter() - t0
+    server.shutdown()
+
+    requests_served = sum(faults._attempts.values())
+    return {
+        "config": vars(args),
+        "repos": len(repos),
+        "commits": len(commits_df),
+        "days": len(commits_by_date),
+        "batches": len(batches),
+        "batches_failed": failed,
+        "days_summarized": summarized,
+        "http_requests": requests_served,
+        "fetch_warnings": len(warnings),
+        "commits_per_s": round(len(commits_df) / timings["fetch_s"], 1) if timings["fetch_s"] else None,
+        "timings": {k: round(v, 3) for k, v in timings.items()},
+        "models": router.metrics_rows(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--commits", type=int, default=500, help="Commits per repo")
+    parser.add_argument("--start", default="2025-01-01")
+    parser.add_argument("--end", default="2025-06-30")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--window-s", type=int, default=60)
+    parser.add_argument("--max-batches", type=int, default=20)
+    parser.add_argument("--json", help="Also write the result to this file")
+    args = parser.parse_args()
+
+    result = run(args)
+    t = result["timings"]
+    print(f"{result['repos']} repos, {result['commits']} commits over {result['days']} days "
+          f"({result['http_requests']} HTTP requests, {result['fetch_warnings']} fetch warnings)")
+    print(f"  list repos  {t['list_repos_s']:8.3f}s")
+    print(f"  fetch       {t['fetch_s']:8.3f}s  ({result['commits_per_s']} commits/s)")
+    print(f"  group       {t['group_s']:8.3f}s")
+    print(f"  summarize   {t['summarize_s']:8.3f}s  ({result['batches']} batches, {result['batches_failed']} failed)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Benchmark suite for the log store, the commit pipeline and the Excel fill.
+
+Everything runs on synthetic data in a temporary directory:
+  * logs      - one entry per weekday (plus some weekly/git duplicates) over 1-5 years
+  * commits   - GitHub /commits pages from 1-100 repos
+  * template  - a generated record book ("Logs" sheet, 21-row WEEK ENDING block with merges)
+
+Each case reports the median time, throughput and tracemalloc peak memory
+(measured in a separate run so tracing doesn't skew the timing). Results are
+written as JSON, and --compare prints the change against an earlier file.
+
+Usage:
+    python benchmarks/bench_suite.py [--years 1 5] [--repos 1 100] [--quick]
+        [--out bench_results.json] [--compare previous.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+import log_store  # noqa: E402
+from commit_ingest import CommitBatcher, group_by_day  # noqa: E402
+from prompt_compaction import compact_batch  # noqa: E402
+
+PAGE_SIZE = 50
+BLOCK_ROWS = 21 # record_book.fill_excel_sheet's TEMPLATE_ROW_COUNT
+WORDS = ["implemented", "fixed", "refactored", "tested", "deployed", "designed", "login", "dashboard",
+         "API", "schema", "pipeline", "report", "cache", "page", "auth", "build", "docs", "UI"]
+CODES = ["1.1", "3.1", "3.2", "4.1", "4.2", "4.3", "6.1", "9.1", "22.1"]
+
+
+# --- GENERATORS ---
+def make_logs(years, seed=0):
+    """Log rows for every weekday over `years` years; ~10% also get a weekly and a git row."""
+    rng = random.Random(seed)
+    start = date(2020, 1, 6)
+    rows = []
+    for i in range(int(years * 365)):
+        d = start + timedelta(days=i)
+        if d.weekday() > 4:
+            continue
+        sources = ["daily"] + (["weekly", "git"] if rng.random() < 0.1 else [])
+        for source in sources:
+            desc = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))
+            rows.append(log_store.make_entry(d, rng.choice(CODES), desc.capitalize() + ".", "", "",
+                                             project=f"owner/repo-{rng.randrange(5)}", source=source))
+    return pd.DataFrame(rows, columns=log_store.COLUMNS)
+
+
+def make_commit_pages(n_repos, commits_per_repo, seed=0):
+    """[(repo, page)] as /commits JSON, with ~5% of SHAs repeated across branches."""
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    pages = []
+    for r in range(n_repos):
+        repo = f"owner/repo-{r:03d}"
+        commits = []
+        for i in range(commits_per_repo):
+            dt = base + timedelta(seconds=rng.randrange(180 * 86400))
+            subject = f"{rng.choice(['Add', 'Fix', 'Refactor', 'Update'])} {rng.choice(WORDS)} {rng.choice(WORDS)}"
+            commits.append({
+                "sha": f"{r:03d}{i:037x}",
+                "commit": {"author": {"date": dt.strftime("%Y-%m-%dT%H:%M:%SZ")},
+                           "message": f"{subject}\n\nDetails for commit {i} of {repo}."},
+            })
+        commits += rng.sample(commits, len(commits) // 20)
+        commits.sort(key=lambda c: c["commit"]["author"]["date"], reverse=True)
+        pages += [(repo, commits[s:s + PAGE_SIZE]) for s in range(0, len(commits), PAGE_SIZE)]
+    return pages
+
+
+def make_template(path):
+    """A record book with the layout fill_excel_sheet expects, styled and merged like the real one."""
+    import openpyxl
+    from openpyxl.styles import Border, Font, PatternFill, Side
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Logs"
+    thin = Side(style="thin")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_fill = PatternFill("solid", fgColor="DDDDDD")
+
+    ws["A1"] = "INDUSTRIAL PLACEMENT RECORD BOOK"
+    ws["A1"].font = Font(bold=True, size=14)
+    ws.merge_cells("A1:T1")
+
+    top = 3
+    ws.cell(top, 1, "WEEK ENDING")
+    ws.cell(top + 1, 1, "DAY")
+    ws.cell(top + 1, 2, "DESCRIPTION OF WORK")
+    ws.cell(top + 1, 3, "CODE")
+    for i, day in enumerate(["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"]):
+        ws.cell(top + 2 + i, 1, day)
+    ws.cell(top + 9, 2, "PROBLEMS ENCOUNTERED")
+    ws.cell(top + 9, 3, "SOLUTIONS FOUND")
+    ws.cell(top + 12, 1, "Supervisor's signature")
+
+    for row in range(top, top + BLOCK_ROWS):
+        for col in range(1, 21):
+            cell = ws.cell(row, col)
+            cell.border = border
+            if row in (top + 1, top + 9):
+                cell.fill = header_fill
+                cell.font = Font(bold=True)
+        # Remarks area to the right of the table, merged per row
+        ws.merge_cells(start_row=row, start_column=4, end_row=row, end_column=20)
+    ws.merge_cells(start_row=top + 12, start_column=1, end_row=top + 14, end_column=3)
+    wb.save(path)
+
+
+# --- MEASUREMENT ---
+def measure(name, fn, items, unit, repeat, setup=None, **params):
+    """Median of `repeat` timed runs, plus one tracemalloc run for the peak."""
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - t0)
+
+    arg = setup() if setup else None
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = statistics.median(times)
+    result = {
+        "name": name,
+        "params": params,
+        "items": items,
+        "unit": unit,
+        "seconds": round(seconds, 5),
+        "throughput_per_s": round(items / seconds, 1) if seconds else None,
+        "peak_mb": round(peak / 2**20, 2),
+    }
+    print(f"{name:<26} {json.dumps(params):<34} {seconds:>9.4f}s {result['throughput_per_s'] or 0:>14,.0f} {unit}/s "
+          f"{result['peak_mb']:>9.1f} MB")
+    return result
+
+
+def bench_log_store(years, repeat):
+    logs = make_logs(years)
+    n = len(logs)
+
+    def write_store(_=None):
+        logs.to_csv(log_store.FILE_NAME, index=False)
+        log_store._cache.update(stamp=None, df=None)
+
+    def load_cold(_):
+        log_store._cache.update(stamp=None, df=None)
+        log_store.load_data()
+
+    write_store()
+    results = [
+        measure("load_data (cold)", load_cold, n, "rows", repeat, years=years),
+        measure("load_data (warm)", lambda _: log_store.load_data(), n, "rows", repeat, years=years),
+    ]
+
+    edits = 20
+    day = date(2020, 1, 6)
+
+    def save_many(_):
+        for i in range(edits):
+            log_store.save_entry(day + timedelta(days=i), "4.2", "Edited entry", "", "", source="daily")
+
+    results.append(measure("save_entry", save_many, edits, "saves", repeat, setup=write_store,
+                           years=years, store_rows=n))
+    week = [log_store.make_entry(day + timedelta(days=i), "4.2", "Weekly", "", "", source="weekly") for i in range(7)]
+    results.append(measure("upsert_entries (week)", lambda _: log_store.upsert_entries(week), len(week), "rows",
+                           repeat, setup=write_store, years=years, store_rows=n))
+    return results
+
+
+def bench_commits(n_repos, commits_per_repo, repeat):
+    pages = make_commit_pages(n_repos, commits_per_repo)
+    n = sum(len(p) for _, p in pages)
+
+    def ingest(_):
+        batcher = CommitBatcher()
+        for repo, commits in pages:
+            batcher.add_page(commits, repo)
+        return batcher.frame()
+
+    frame = ingest(None)
+    by_day = group_by_day(frame)
+    dates = sorted(by_day, reverse=True)
+    batches = [dates[i:i + 3] for i in range(0, len(dates), 3)]
+
+    def compact_all(_):
+        for b in batches:
+            compact_batch(by_day, b)
+
+    return [
+        measure("commit ingest", ingest, n, "commits", repeat, repos=n_repos),
+        measure("group_by_day", lambda _: group_by_day(frame), len(frame), "commits", repeat, repos=n_repos),
+        measure("compact_batch (all)", compact_all, len(frame), "commits", repeat, repos=n_repos,
+                batches=len(batches)),
+    ]
+
+
+def bench_excel(template, months, repeat):
+    import openpyxl
+    from record_book import copy_range, fill_excel_sheet, get_writeable_cell
+
+    def fresh_sheet():
+        return openpyxl.load_workbook(template)["Logs"]
+
+    copies = 5
+    top = 3
+
+    def copy_blocks(ws):
+        for i in range(1, copies + 1):
+            copy_range(ws, top, top + BLOCK_ROWS - 1, 1, 20, top + (BLOCK_ROWS + 1) * i)
+
+    lookups = 2000
+
+    def lookup_cells(ws):
+        for i in range(lookups):
+            get_writeable_cell(ws, top + i % BLOCK_ROWS, 4 + i % 17)
+
+    start = datetime(2025, 1, 1)
+    end = (pd.Timestamp(start) + pd.DateOffset(months=months) - pd.Timedelta(days=1)).to_pydatetime()
+    logs = make_logs(months / 12 + 0.1)
+    shift = pd.Timestamp(start) - pd.Timestamp("2020-01-06")
+    # Move the generated year onto the filled range
+    for col in ("Date", "Week_Ending"):
+        logs[col] = (pd.to_datetime(logs[col]) + shift).dt.strftime("%Y-%m-%d")
+    logs["Day"] = pd.to_datetime(logs["Date"]).dt.day_name().str.upper()
+    logs["Week_Ending"] = (pd.to_datetime(logs["Date"])
+                           + pd.to_timedelta(6 - pd.to_datetime(logs["Date"]).dt.weekday, unit="D")).dt.strftime("%Y-%m-%d")
+
+    def fill(_):
+        out, msg = fill_excel_sheet(template, logs.copy(), start, end)
+        if out is None:
+            raise RuntimeError(msg)
+
+    return [
+        measure("copy_range", copy_blocks, copies, "blocks", repeat, setup=fresh_sheet),
+        measure("get_writeable_cell", lookup_cells, lookups, "lookups", repeat, setup=fresh_sheet),
+        measure("fill_excel_sheet", fill, months, "months", repeat, months=months, rows=len(logs)),
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, previous_path):
+    with open(previous_path) as f:
+        previous = {(r["name"], json.dumps(r["params"], sort_keys=True)): r for r in json.load(f)["results"]}
+    print(f"\nChange vs {previous_path}:")
+    for r in results:
+        old = previous.get((r["name"], json.dumps(r["params"], sort_keys=True)))
+        if not old or not old["seconds"]:
+            continue
+        ratio = r["seconds"] / old["seconds"]
+        flag = "  <-- slower" if ratio > 1.2 else ""
+        print(f"  {r['name']:<26} {json.dumps(r['params']):<34} {ratio:>6.2f}x time, "
+              f"{r['peak_mb'] - old['peak_mb']:+.1f} MB{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log store / commit pipeline / Excel benchmarks.")
+    parser.add_argument("--years", type=float, nargs="+", default=[1, 5], help="Log store sizes in years")
+    parser.add_argument("--repos", type=int, nargs="+", default=[1, 10, 100], help="Commit pipeline repo counts")
+    parser.add_argument("--commits-per-repo", type=int, default=300)
+    parser.add_argument("--months", type=int, default=12, help="Months filled by fill_excel_sheet")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="Small sizes, one repeat (smoke run)")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+    if args.quick:
+        args.years, args.repos, args.months, args.repeat = [1], [1, 10], 2, 1
+
+    out_path = os.path.abspath(args.out)
+    workdir = tempfile.mkdtemp(prefix="logbook-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir) # log_store and the template write relative to the working directory
+    results = []
+    try:
+        print(f"{'case':<26} {'params':<34} {'median':>10} {'throughput':>20} {'peak':>12}")
+        for years in args.years:
+            results += bench_log_store(years, args.repeat)
+        for n_repos in args.repos:
+            results += bench_commits(n_repos, args.commits_per_repo, args.repeat)
+        template = os.path.join(workdir, "template.xlsx")
+        make_template(template)
+        results += bench_excel(template, args.months, args.repeat)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {len(results)} results to {out_path}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
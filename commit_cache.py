@@ -0,0 +1,193 @@
+"""
+Local commit cache.
+
+Commits are stored as Parquet, hive-partitioned by repo and month:
+
+    fetched_commits/repo=<owner%2Fname>/month=YYYY-MM/part-0.parquet
+
+so a date-range load only opens the partitions that overlap the range and
+only reads the columns it needs. Dates are kept as "YYYY-MM-DD" strings, which
+sort and compare correctly without a round-trip through datetime.
+"""
+import os
+from urllib.parse import quote
+
+import pandas as pd
+
+import tracing
+
+CACHE_DIR = "fetched_commits"
+LEGACY_CSV = "fetched_commits.csv"
+COLUMNS = ["sha", "date", "repo", "message"]
+PART_FILE = "part-0.parquet"
+
+
+def _partition_dir(repo, month):
+    return os.path.join(CACHE_DIR, f"repo={quote(repo, safe='')}", f"month={month}")
+
+
+def _file_schema():
+    import pyarrow as pa
+    # 'repo' lives in the directory name, not in the file
+    return pa.schema([("sha", pa.string()), ("date", pa.string()), ("message", pa.string())])
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([("repo", pa.string()), ("month", pa.string())]), flavor="hive")
+
+
+def _write_partition(repo, month, part_df):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    out_dir = _partition_dir(repo, month)
+    out_path = os.path.join(out_dir, PART_FILE)
+    if part_df.empty:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        return
+
+    os.makedirs(out_dir, exist_ok=True)
+    part_df = part_df.sort_values("date", kind="stable")
+    table = pa.Table.from_pandas(part_df[["sha", "date", "message"]], schema=_file_schema(), preserve_index=False)
+    # Write-then-rename so a crash never leaves a half-written partition behind
+    tmp_path = out_path + ".tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, out_path)
+
+
+def _read_partition(repo, month):
+    import pyarrow.parquet as pq
+
+    path = os.path.join(_partition_dir(repo, month), PART_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["sha", "date", "message"])
+    return pq.read_table(path).to_pandas()
+
+
+def _normalize(commits_df):
+    df = commits_df.copy()
+    for col in COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    df["date"] = df["date"].astype(str).str.slice(0, 10)
+    return df[COLUMNS]
+
+
+def has_cache():
+    migrate_legacy_csv()
+    return os.path.isdir(CACHE_DIR)
+
+
+def list_cached_repos():
+    """Repo names present in the cache (directory listing only, no file reads)."""
+    from urllib.parse import unquote
+
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    return sorted(
+        unquote(name[len("repo="):]) for name in os.listdir(CACHE_DIR) if name.startswith("repo=")
+    )
+
+
+def save_commits(commits_df, repos, start_date, end_date):
+    """
+    Stores a fetch of `repos` over [start_date, end_date] in the cache.
+
+    Every (repo, month) partition the window touches is rewritten as: the rows
+    already cached outside the window + the freshly fetched rows. Re-fetching a
+    range therefore replaces it rather than duplicating it, and commits cached
+    from other ranges are kept. GitHub filters since/until on the committer
+    date, so a rebased or cherry-picked commit can come back with an author date
+    outside the window; cached rows whose SHA was just fetched are dropped too.
+    """
+    start_str = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+    end_str = pd.Timestamp(end_date).strftime("%Y-%m-%d")
+    months = pd.period_range(start_str, end_str, freq="M").strftime("%Y-%m")
+
+    new_df = _normalize(commits_df).drop_duplicates(subset="sha")
+    new_df["month"] = new_df["date"].str.slice(0, 7)
+    new_parts = {key: part for key, part in new_df.groupby(["repo", "month"], sort=False)}
+    fetched_shas = set(new_df["sha"])
+
+    touched = set(new_parts) | {(repo, month) for repo in repos for month in months}
+    for repo, month in touched:
+        old = _read_partition(repo, month)
+        old = old[((old["date"] < start_str) | (old["date"] > end_str)) & ~old["sha"].isin(fetched_shas)]
+        fresh = new_parts.get((repo, month))
+        if fresh is not None:
+            old = pd.concat([old, fresh[["sha", "date", "message"]]], ignore_index=True)
+        _write_partition(repo, month, old)
+
+
+def append_commits(commits_df):
+    """
+    Adds commits to the cache without touching anything else in their partitions
+    (used by the webhook receiver). SHAs already cached are skipped, so a
+    redelivered push is harmless. Returns the number of commits added.
+    """
+    new_df = _normalize(commits_df).drop_duplicates(subset="sha")
+    new_df["month"] = new_df["date"].str.slice(0, 7)
+
+    added = 0
+    for (repo, month), part in new_df.groupby(["repo", "month"], sort=False):
+        old = _read_partition(repo, month)
+        fresh = part[~part["sha"].isin(old["sha"])]
+        if fresh.empty:
+            continue
+        _write_partition(repo, month, pd.concat([old, fresh[["sha", "date", "message"]]], ignore_index=True))
+        added += len(fresh)
+    return added
+
+
+def load_commits(start_date, end_date, repos=None):
+    """
+    Loads cached commits with start_date <= date <= end_date.
+
+    The month and repo predicates prune whole partition directories; the date
+    predicate is pushed down to Parquet row-group statistics. Returns a
+    DataFrame with 'date' as a "YYYY-MM-DD" string.
+    """
+    import pyarrow.dataset as ds
+
+    if not has_cache():
+        return pd.DataFrame(columns=COLUMNS)
+
+    start_str = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+    end_str = pd.Timestamp(end_date).strftime("%Y-%m-%d")
+
+    dataset = ds.dataset(CACHE_DIR, format="parquet", partitioning=_partitioning())
+    predicate = (
+        (ds.field("month") >= start_str[:7]) & (ds.field("month") <= end_str[:7])
+        & (ds.field("date") >= start_str) & (ds.field("date") <= end_str)
+    )
+    if repos:
+        predicate = predicate & ds.field("repo").isin(list(repos))
+
+    table = dataset.to_table(columns=COLUMNS, filter=predicate)
+    tracing.count("commit_cache_rows_loaded", table.num_rows)
+    return table.to_pandas()
+
+
+def count_cached_commits():
+    """Total cached commits, read from Parquet footers only."""
+    import pyarrow.dataset as ds
+
+    if not has_cache():
+        return 0
+    return ds.dataset(CACHE_DIR, format="parquet", partitioning=_partitioning()).count_rows()
+
+
+def migrate_legacy_csv():
+    """One-off conversion of the old flat fetched_commits.csv into the partitioned cache."""
+    if os.path.isdir(CACHE_DIR) or not os.path.exists(LEGACY_CSV):
+        return
+    legacy = _normalize(pd.read_csv(LEGACY_CSV, dtype=str))
+    if legacy.empty:
+        return
+    legacy["month"] = legacy["date"].str.slice(0, 7)
+    for (repo, month), part in legacy.groupby(["repo", "month"], sort=False):
+        _write_partition(repo, month, part)
+    os.replace(LEGACY_CSV, LEGACY_CSV + ".migrated")
@@ -0,0 +1,74 @@
+"""
+Columnar ingestion of GitHub commit pages.
+
+Each page of /commits JSON is unpacked into column lists in one pass (no
+per-commit dicts, no strptime/strftime). Dates, de-duplication and per-day
+grouping are then done in bulk with pandas/numpy when the fetch finishes.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["sha", "date", "repo", "message", "author"]
+
+
+class CommitBatcher:
+    """Accumulates commit pages as columns; call frame() once fetching is done."""
+
+    def __init__(self):
+        self._sha = []
+        self._date = []
+        self._message = []
+        self._repo = []
+        self._author = []
+        self.seen_shas = set()
+
+    def add_page(self, commits, repo):
+        """
+        Appends one page of the /repos/{repo}/commits response.
+        Returns how many SHAs on the page had not been seen before.
+        """
+        shas = [c["sha"] for c in commits]
+        self._sha.extend(shas)
+        # Author dates are ISO-8601 ("2025-01-31T18:04:11Z"); the day is the first 10 chars
+        self._date.extend([c["commit"]["author"]["date"] for c in commits])
+        self._message.extend([c["commit"]["message"] for c in commits])
+        self._repo.extend([repo] * len(commits))
+        # GitHub account login; "author" is null when the commit email isn't linked to an account
+        self._author.extend([(c.get("author") or {}).get("login") for c in commits])
+
+        before = len(self.seen_shas)
+        self.seen_shas.update(shas)
+        return len(self.seen_shas) - before
+
+    def __len__(self):
+        return len(self.seen_shas)
+
+    def frame(self):
+        """All unique commits (first occurrence of each SHA wins) as a DataFrame."""
+        df = pd.DataFrame({
+            "sha": self._sha,
+            "date": pd.Series(self._date, dtype=object).str.slice(0, 10),
+            "repo": self._repo,
+            "message": self._message,
+            "author": self._author,
+        }, columns=COLUMNS)
+        return df.drop_duplicates(subset="sha", keep="first", ignore_index=True)
+
+
+def group_by_day(commits_df):
+    """
+    Returns {"YYYY-MM-DD": [commit records...]} in one sort + split, instead of
+    appending commits to per-day lists one at a time.
+    """
+    if commits_df.empty:
+        return {}
+    df = commits_df.sort_values("date", kind="stable")
+    dates = df["date"].to_numpy()
+    # Build the records from column lists; DataFrame.to_dict("records") is several times slower
+    columns = list(df.columns)
+    records = [dict(zip(columns, row)) for row in zip(*(df[c].tolist() for c in columns))]
+
+    # Boundaries where the (sorted) date changes
+    starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]])
+    ends = np.r_[starts[1:], len(dates)]
+    return {dates[s]: records[s:e] for s, e in zip(starts, ends)}
@@ -0,0 +1,132 @@
+"""
+Offline extractive summarizer (no API key, no network).
+
+Scores every commit subject in the range at once:
+  * TF-IDF over all subjects in the range, so words that appear on every day
+    ("update", repo names) count for little and specific ones count for more
+  * a bonus for subjects that open with an action verb ("Add", "Fix", ...)
+Then keeps the top few subjects per day and rewrites them as past-tense
+sentences. Everything is column-wise pandas, so thousands of days take
+seconds. The output also works as a first draft to fall back on, or to polish
+with the LLM.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from prompt_compaction import NOISE_PATTERNS, build_repo_aliases
+
+MAX_SENTENCES = 3
+ACTION_VERB_WEIGHT = 1.5
+
+# Imperative commit verb -> past tense used in the log
+ACTION_VERBS = {
+    "add": "Added", "implement": "Implemented", "fix": "Fixed", "resolve": "Resolved",
+    "update": "Updated", "remove": "Removed", "delete": "Deleted", "refactor": "Refactored",
+    "create": "Created", "improve": "Improved", "optimize": "Optimized", "optimise": "Optimised",
+    "test": "Tested", "document": "Documented", "integrate": "Integrated", "migrate": "Migrated",
+    "deploy": "Deployed", "design": "Designed", "configure": "Configured", "build": "Built",
+    "write": "Wrote", "move": "Moved", "rename": "Renamed", "clean": "Cleaned up",
+    "handle": "Handled", "support": "Added support for", "enable": "Enabled", "disable": "Disabled",
+    "upgrade": "Upgraded", "introduce": "Introduced", "extract": "Extracted", "replace": "Replaced",
+    "setup": "Set up", "set": "Set", "init": "Initialised", "initialize": "Initialized",
+    "secure": "Secured", "merge": "Merged", "validate": "Validated", "debug": "Debugged", "style": "Styled",
+}
+STOPWORDS = frozenset(
+    "a an the and or of to in on for with from by at is are was be it this that as into "
+    "via when if not no use using some more new"
+    .split()
+)
+
+_CONVENTIONAL_PREFIX = re.compile(r"^\w+(\([^)]*\))?!?:\s*")
+_ISSUE_REFS = re.compile(r"\s*\(?#\d+\)?")
+_TOKEN = r"[a-z][a-z0-9_+#-]+"
+
+
+def _first_lines(messages):
+    return messages.astype(str).str.strip().str.split("\n", n=1).str[0].str.strip()
+
+
+def _clean_subjects(first_lines):
+    subjects = first_lines.str.replace(_CONVENTIONAL_PREFIX, "", regex=True)
+    subjects = subjects.str.replace(_ISSUE_REFS, "", regex=True)
+    return subjects.str.strip().str.rstrip(".").str.strip()
+
+
+def _to_sentence(subject):
+    first, _, rest = subject.partition(" ")
+    verb = ACTION_VERBS.get(first.lower())
+    if verb:
+        text = f"{verb} {rest}".strip()
+    elif first.lower().endswith("ed"):
+        text = subject[:1].upper() + subject[1:]
+    else:
+        text = f"Worked on {subject[:1].lower() + subject[1:]}"
+    return text + "."
+
+
+def score_subjects(subjects):
+    """TF-IDF (documents = subjects) plus an action-verb bonus, one score per subject."""
+    tokens = subjects.str.lower().str.findall(_TOKEN).explode().dropna()
+    tokens = tokens[~tokens.isin(STOPWORDS)]
+    if tokens.empty:
+        return pd.Series(0.0, index=subjects.index)
+
+    pairs = tokens.groupby(level=0).value_counts().rename("tf").reset_index()
+    pairs.columns = ["row", "term", "tf"]
+    n_docs = len(subjects)
+    doc_freq = pairs.groupby("term")["row"].transform("size")
+    pairs["w"] = pairs["tf"] * (np.log((n_docs + 1) / (doc_freq + 1)) + 1)
+
+    per_row = pairs.groupby("row").agg(total=("w", "sum"), n_terms=("tf", "sum"))
+    # Normalise by length so long subjects don't win just by being long, but keep some length reward
+    tfidf = per_row["total"] / np.sqrt(per_row["n_terms"])
+    scores = tfidf.reindex(subjects.index, fill_value=0.0)
+
+    first_word = subjects.str.split(" ", n=1).str[0].str.lower()
+    return scores + first_word.isin(ACTION_VERBS.keys()) * ACTION_VERB_WEIGHT
+
+
+def summarize_days(commits_df, max_sentences=MAX_SENTENCES):
+    """
+    commits_df: columns date ("YYYY-MM-DD"), repo, message.
+    Returns a DataFrame with Date, Project, Description, one row per input day
+    (a day whose subjects are all empty after cleaning gets just "Worked on <repos>.").
+    """
+    if commits_df is None or commits_df.empty:
+        return pd.DataFrame(columns=["Date", "Project", "Description"])
+
+    df = commits_df[["date", "repo", "message"]].reset_index(drop=True)
+    first_lines = _first_lines(df["message"])
+    df["subject"] = _clean_subjects(first_lines)
+    # Every input day gets a row, even if none of its subjects survive the filters below
+    repos = df.groupby("date")["repo"].agg(lambda r: sorted(set(r)))
+    aliases = build_repo_aliases(df["repo"].unique())
+
+    # Drop merges/bots, unless that's all the day has
+    noise = first_lines.str.contains(NOISE_PATTERNS)
+    day_all_noise = noise.groupby(df["date"]).transform("all")
+    df = df[(~noise | day_all_noise) & (df["subject"] != "")]
+
+    # Near-duplicates within a day count once
+    df = df.assign(key=df["subject"].str.lower().str.replace(r"[^a-z ]", "", regex=True).str.strip())
+    df = df.drop_duplicates(subset=["date", "key"]).copy()
+
+    df["score"] = score_subjects(df["subject"])
+    df["rank"] = df.groupby("date")["score"].rank(method="first", ascending=False)
+    top = df[df["rank"] <= max_sentences].sort_index()  # keep the day's original order
+
+    sentences = top["subject"].map(_to_sentence).groupby(top["date"]).agg(" ".join)
+    extra = (df.groupby("date").size().reindex(repos.index, fill_value=0)
+             - top.groupby("date").size().reindex(repos.index, fill_value=0))
+
+    out = pd.DataFrame({
+        "Date": repos.index,
+        "Project": repos.map(", ".join).values,
+    })
+    intro = repos.map(lambda r: "Worked on " + ", ".join(aliases[x] for x in r) + ".").values
+    tail = np.where(extra.values > 0, [f" Also made {n} smaller change{'s' if n > 1 else ''}." for n in extra.values], "")
+    out["Description"] = intro + " " + sentences.reindex(repos.index, fill_value="").values + tail
+    out["Description"] = out["Description"].str.strip()
+    return out.reset_index(drop=True)
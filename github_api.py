@@ -0,0 +1,459 @@
+"""
+GitHub REST helpers for the Git import tab.
+
+Commit fetching feeds pages straight into a commit_ingest.CommitBatcher. With
+"Scan ALL branches" on, branches are first grouped by head SHA and the default
+branch is walked once. After that, each remaining unique head:
+  * is skipped if its head commit was already seen (nothing new on it)
+  * otherwise fetches only its own commits through the compare endpoint
+    (default_branch...head), or, if compare can't be used, walks the branch
+    until it reaches an already-seen SHA.
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+import tracing
+
+# Overridable so the app can run against stub_server.py or GitHub Enterprise
+API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+PER_PAGE = 50 # Reduced to 50 to avoid IncompleteRead on unstable connections
+MAX_PAGES = 20 # Limit pages to prevent infinite loops on massive repos
+RETRY_STATUSES = [409, 500, 502, 503, 504]
+REPO_PAGE_WORKERS = 8
+SEARCH_MAX_RESULTS = 1000 # The search API never returns more than this per query
+SEARCH_MAX_WAIT_S = 65 # Longest wait for the search rate limit (30/min) before giving up on a window
+EVENTS_MAX_PAGES = 3 # The events feed only goes back 300 events / 90 days
+
+
+def get_with_retry(session, url, headers=None, params=None, retries=3, warn=print, label=""):
+    """GET with retries on network errors and 5xx. Returns the last response, or None if every attempt raised."""
+    resp = None
+    path = urlparse(url).path
+    for retry_attempt in range(retries):
+        if retry_attempt:
+            tracing.count("http_retries")
+        try:
+            with tracing.span("http GET", path=path, page=(params or {}).get("page", 1)):
+                resp = session.get(url, headers=headers, params=params, timeout=30)
+            tracing.count("http_calls")
+            tracing.count("http_bytes", len(resp.content))
+            if resp.status_code == 200:
+                break # Success
+            tracing.count(f"http_status_{resp.status_code}")
+            if resp.status_code not in RETRY_STATUSES:
+                # If it's a client error (except timeouts/server errors), don't retry (e.g. 404, 401)
+                break
+        except Exception as e:
+            tracing.count("http_errors")
+            if retry_attempt == retries - 1:
+                warn(f"Failed to fetch {label or url} after {retries} attempts: {e}")
+            with tracing.span("retry sleep"):
+                time.sleep(2) # Wait before retry
+    return resp
+
+
+def _last_page(resp):
+    """Page count from the pagination Link header (1 if there is no rel="last")."""
+    last_url = resp.links.get("last", {}).get("url")
+    if not last_url:
+        return 1
+    return int(parse_qs(urlparse(last_url).query).get("page", ["1"])[0])
+
+
+def list_repos(session, username=None, headers=None, authenticated=True):
+    """
+    Every repository the user can see, as [{"full_name", "pushed_at", "updated_at"}].
+    Page 1 is fetched first; its Link header gives the last page, and pages
+    2..last are then fetched concurrently over the shared session.
+    """
+    if authenticated:
+        # Authenticated: Get all accessible repos (private & public)
+        url = f"{API_URL}/user/repos"
+        base_params = {"per_page": 100, "affiliation": "owner,collaborator,organization_member", "sort": "updated"}
+    else:
+        # Public only
+        url = f"{API_URL}/users/{username}/repos"
+        base_params = {"per_page": 100, "sort": "updated"}
+
+    def fetch_page(page):
+        resp = get_with_retry(session, url, headers=headers, params=dict(base_params, page=page))
+        if resp is None:
+            raise RuntimeError(f"no response for page {page}")
+        if resp.status_code != 200:
+            raise RuntimeError(f"{resp.status_code} - {resp.text}")
+        return resp
+
+    first = fetch_page(1)
+    pages = [first.json()]
+    last = _last_page(first)
+    if last > 1:
+        with ThreadPoolExecutor(max_workers=min(REPO_PAGE_WORKERS, last - 1)) as pool:
+            pages.extend(r.json() for r in pool.map(fetch_page, range(2, last + 1)))
+
+    repos = {}
+    for data in pages:
+        for r in data:
+            repos[r["full_name"]] = {
+                "full_name": r["full_name"],
+                "pushed_at": r.get("pushed_at"),
+                "updated_at": r.get("updated_at"),
+            }
+    return list(repos.values())
+
+
+def get_default_branch(session, repo, headers=None):
+    resp = get_with_retry(session, f"{API_URL}/repos/{repo}", headers=headers)
+    if resp is not None and resp.status_code == 200:
+        return resp.json().get("default_branch")
+    return None
+
+
+def get_pushed_at(session, repos, headers=None):
+    """Current [{"full_name", "pushed_at"}] for `repos`, fetched concurrently; repos that fail are left out."""
+    def fetch(repo):
+        resp = get_with_retry(session, f"{API_URL}/repos/{repo}", headers=headers)
+        if resp is not None and resp.status_code == 200:
+            return {"full_name": repo, "pushed_at": resp.json().get("pushed_at")}
+        return None
+
+    if not repos:
+        return []
+    with ThreadPoolExecutor(max_workers=min(REPO_PAGE_WORKERS, len(repos))) as pool:
+        return [r for r in pool.map(fetch, repos) if r]
+
+
+def list_branches(session, repo, headers=None):
+    """All branches as [{"name", "sha"}], or None if they can't be listed."""
+    branches = []
+    page = 1
+    while True:
+        resp = get_with_retry(session, f"{API_URL}/repos/{repo}/branches", headers=headers,
+                              params={"per_page": 100, "page": page})
+        if resp is None or resp.status_code != 200:
+            return branches or None
+        data = resp.json()
+        branches.extend({"name": b["name"], "sha": b["commit"]["sha"]} for b in data)
+        if len(data) < 100:
+            return branches
+        page += 1
+
+
+def group_by_head(branches):
+    """{head_sha: [branch names]} - branches pointing at the same commit are fetched once."""
+    heads = {}
+    for b in branches:
+        heads.setdefault(b["sha"], []).append(b["name"])
+    return heads
+
+
+def fetch_commits(session, repo, batcher, since, until, author=None, sha=None, headers=None,
+                  stop_at_seen=False, warn=print):
+    """
+    Pages through /repos/{repo}/commits into `batcher`.
+    With stop_at_seen, stops after the first page that contains an already-seen SHA:
+    from there on the branch history is shared with something already fetched.
+    Returns False if a page failed, so the range may be incomplete for this repo.
+    """
+    label = sha or "default"
+    page = 1
+    while True:
+        params = {"since": since, "until": until, "per_page": PER_PAGE, "page": page}
+        # Apply Author Filter IF checkbox is checked
+        if author:
+            params["author"] = author
+        if sha:
+            params["sha"] = sha
+
+        resp = get_with_retry(session, f"{API_URL}/repos/{repo}/commits", headers=headers, params=params,
+                              warn=warn, label=f"{repo} (Page {page})")
+        if resp is None:
+            return False # Failed all retries
+
+        if resp.status_code == 200:
+            commits = resp.json()
+            if not commits:
+                return True # No more commits
+
+            new = batcher.add_page(commits, repo)
+            if stop_at_seen and new < len(commits):
+                return True # Reached history we already have
+
+            # Optimization: If fewer than PER_PAGE results, we reached end
+            if len(commits) < PER_PAGE:
+                return True
+            if page >= MAX_PAGES:
+                warn(f"{repo}/{label}: stopped at {MAX_PAGES} pages; older commits in the range were not fetched.")
+                return False
+            page += 1
+        elif resp.status_code == 409:
+            return True # Empty repo
+        else:
+            warn(f"Failed {repo}/{label}: {resp.status_code}")
+            return False
+
+
+def fetch_compare(session, repo, batcher, base, head, since, until, author=None, headers=None):
+    """
+    Adds the commits on `head` that are not on `base`, filtered to [since, until) and author.
+    Returns False if compare can't give the full answer (error, or more commits ahead than it listed).
+    """
+    resp = get_with_retry(session, f"{API_URL}/repos/{repo}/compare/{base}...{head}", headers=headers,
+                          params={"per_page": 100})
+    if resp is None or resp.status_code != 200:
+        return False
+    data = resp.json()
+    if len(data.get("commits", [])) < data.get("ahead_by", 0):
+        return False # Truncated; let the caller walk the branch instead
+
+    commits = [
+        c for c in data.get("commits", [])
+        # Committer date, like the since/until filter of the /commits walk this replaces
+        if since <= c["commit"]["committer"]["date"] < until
+        and (not author or ((c.get("author") or {}).get("login") or "").lower() == author.lower())
+    ]
+    if commits:
+        batcher.add_page(commits, repo)
+    return True
+
+
+def scan_repo(session, repo, batcher, since, until, author=None, all_branches=False, headers=None,
+              warn=print, status=lambda msg: None):
+    """
+    Fetches one repo into `batcher`: the default branch, plus the unique commits of other branches.
+    Returns True only if every request succeeded, i.e. the repo's commits in the range are complete.
+    """
+    status(f"Fetching {repo} [default]...")
+    tracing.count("repos_scanned")
+    if not all_branches:
+        return fetch_commits(session, repo, batcher, since, until, author, headers=headers, warn=warn)
+
+    status(f"Listing branches for {repo}...")
+    branches = list_branches(session, repo, headers)
+    if not branches:
+        warn(f"Could not list branches for {repo}, defaulting to main.")
+        fetch_commits(session, repo, batcher, since, until, author, headers=headers, warn=warn)
+        return False # Other branches were not fetched
+
+    default_branch = get_default_branch(session, repo, headers)
+    heads = group_by_head(branches)
+    default_head = next((b["sha"] for b in branches if b["name"] == default_branch), None)
+
+    # Default branch first: it holds most of the history every other branch shares
+    complete = fetch_commits(session, repo, batcher, since, until, author, sha=default_head, headers=headers,
+                             warn=warn)
+    heads.pop(default_head, None)
+
+    skipped = 0
+    for head_sha, names in heads.items():
+        if head_sha in batcher.seen_shas:
+            skipped += len(names) # Head already fetched, so everything on it is too
+            tracing.count("branches_skipped_seen", len(names))
+            continue
+        label = ", ".join(names)
+        status(f"Fetching {repo} [{label}]...")
+        if default_branch and fetch_compare(session, repo, batcher, default_branch, head_sha, since, until,
+                                            author, headers):
+            continue
+        complete &= fetch_commits(session, repo, batcher, since, until, author, sha=head_sha, headers=headers,
+                                  stop_at_seen=True, warn=warn)
+    if skipped:
+        status(f"{repo}: skipped {skipped} branch(es) already contained in fetched history")
+    return complete
+
+
+# --- FAST INGEST (search + events) ---
+def _utc_iso(timestamp):
+    """Search results carry the committer's offset ("...T21:00:00.000-08:00"); REST uses UTC ("...Z")."""
+    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _as_rest_commit(item):
+    """A search hit reduced to the /commits fields CommitBatcher reads, dated in UTC like every other source."""
+    return {
+        "sha": item["sha"],
+        "commit": {"author": {"date": _utc_iso(item["commit"]["author"]["date"])},
+                   "message": item["commit"]["message"]},
+        "author": item.get("author"),
+    }
+
+
+def _rate_limit_wait(resp):
+    """Seconds until GitHub lifts a rate limit, from Retry-After or X-RateLimit-Reset (0 if not limited)."""
+    if resp.headers.get("Retry-After"):
+        return float(resp.headers["Retry-After"])
+    if resp.headers.get("X-RateLimit-Remaining") == "0" and resp.headers.get("X-RateLimit-Reset"):
+        return max(0.0, float(resp.headers["X-RateLimit-Reset"]) - time.time()) + 1
+    return 0.0
+
+
+def search_commits(session, batcher, author, start_date, end_date, headers=None, status=lambda msg: None):
+    """
+    All of `author`'s commits in the date range across every repo, via the commit search API.
+    A query never returns more than SEARCH_MAX_RESULTS, so a window whose total is over
+    the cap is split in half by committer date and each half is queried again.
+
+    The search API allows 30 requests/min (10 without a token), so pages are read
+    one at a time and the client waits out the limit (up to SEARCH_MAX_WAIT_S) when
+    GitHub reports it exhausted. A window that still can't be read (or reached) is
+    returned as missed.
+
+    Returns (repos with matches, complete, missed windows as [(start, end)]). complete is
+    False when a single day is still over the cap or GitHub flagged the results as incomplete.
+    """
+    url = f"{API_URL}/search/commits"
+
+    def wait_out(seconds):
+        if seconds > SEARCH_MAX_WAIT_S:
+            return # Surfaces as a 403/429 on the next request
+        status(f"Commit search rate limit reached; waiting {seconds:.0f}s...")
+        with tracing.span("rate limit sleep"):
+            time.sleep(seconds)
+
+    def fetch_page(lo, hi, page):
+        """(page JSON, last page number), or None if the search stays rate limited or unreachable."""
+        params = {
+            "q": f"author:{author} committer-date:{lo:%Y-%m-%d}..{hi:%Y-%m-%d}",
+            "per_page": 100,
+            "sort": "committer-date",
+            "order": "desc",
+            "page": page,
+        }
+        for _ in range(2):
+            resp = get_with_retry(session, url, headers=headers, params=params)
+            if resp is None:
+                return None
+            wait = _rate_limit_wait(resp)
+            if resp.status_code == 200:
+                if wait:
+                    # Quota used up: pause now rather than fail the next request
+                    wait_out(wait)
+                return resp.json(), _last_page(resp)
+            if resp.status_code not in (403, 429):
+                raise RuntimeError(f"Commit search failed: {resp.status_code}")
+            tracing.count("search_rate_limited")
+            if not wait or wait > SEARCH_MAX_WAIT_S:
+                return None
+            wait_out(wait)
+        return None
+
+    pages = []
+    complete = True
+    missed = []
+    windows = [(start_date, end_date)]
+    while windows:
+        lo, hi = windows.pop()
+        first = fetch_page(lo, hi, 1)
+        if first is None:
+            missed += [(lo, hi)] + windows # Still limited; the rest would fail the same way
+            break
+        data, last = first
+        total = data.get("total_count", 0)
+        if total > SEARCH_MAX_RESULTS and lo < hi:
+            mid = lo + timedelta(days=(hi - lo).days // 2)
+            windows += [(lo, mid), (mid + timedelta(days=1), hi)]
+            tracing.count("search_window_splits")
+            continue
+        if total > SEARCH_MAX_RESULTS:
+            complete = False # One day over the cap; can't split further
+
+        window_pages = [data]
+        for page in range(2, min(last, SEARCH_MAX_RESULTS // 100) + 1):
+            result = fetch_page(lo, hi, page)
+            if result is None:
+                window_pages = None
+                break
+            window_pages.append(result[0])
+        if window_pages is None:
+            missed += [(lo, hi)] + windows
+            break
+        pages += window_pages
+
+    by_repo = {}
+    for data in pages:
+        for item in data.get("items", []):
+            by_repo.setdefault(item["repository"]["full_name"], []).append(_as_rest_commit(item))
+    for repo, items in by_repo.items():
+        batcher.add_page(items, repo)
+
+    complete = complete and not any(p.get("incomplete_results") for p in pages)
+    return set(by_repo), complete, missed
+
+
+def recent_push_repos(session, username, since, until, headers=None):
+    """Repos the user pushed to within [since, until), from the public/user events feed."""
+    repos = set()
+    for page in range(1, EVENTS_MAX_PAGES + 1):
+        resp = get_with_retry(session, f"{API_URL}/users/{username}/events", headers=headers,
+                              params={"per_page": 100, "page": page})
+        if resp is None or resp.status_code != 200:
+            break
+        events = resp.json()
+        for e in events:
+            if e.get("type") == "PushEvent" and since <= e.get("created_at", "") < until:
+                repos.add(e["repo"]["name"])
+        # Events are newest first; stop once we are past the start of the range
+        if not events or events[-1].get("created_at", "") < since:
+            break
+    return repos
+
+
+def fast_ingest(session, batcher, username, start_date, end_date, all_branches=False, headers=None,
+                warn=print, status=lambda msg: None):
+    """
+    Finds the user's commits in a handful of search + events calls instead of
+    listing every repo and branch. Per-repo fetching is only used for repos that
+    had matches and where search can't be trusted to be complete:
+      * the search is still incomplete after splitting by date (matched repos)
+      * "Scan ALL branches" is on, since search only indexes default branches (matched + pushed repos)
+      * the events feed shows pushes the search didn't return (not indexed yet, or on branches)
+    Date windows the search couldn't read (rate limited) are scanned per repo
+    instead, over every listed repo pushed since the window start.
+    Returns the repos whose commits in the range were fetched completely.
+    """
+    since = start_date.strftime('%Y-%m-%dT00:00:00Z')
+    until = (end_date + timedelta(days=1)).strftime('%Y-%m-%dT00:00:00Z')
+
+    status("Searching commits across all repositories...")
+    matched, complete, missed = search_commits(session, batcher, username, start_date, end_date, headers, status)
+    status("Reading recent push events...")
+    pushed = recent_push_repos(session, username, since, until, headers)
+
+    fallback = pushed - matched
+    if not complete:
+        warn(f"Commit search returned incomplete results (over {SEARCH_MAX_RESULTS} commits on a single day, or "
+             "flagged incomplete by GitHub); fetching matched repos individually. Repos seen only in the missing "
+             "results can still be absent; use 'Fetch from GitHub' for those.")
+        fallback |= matched
+    if all_branches:
+        fallback |= matched | pushed
+
+    failed = {repo for repo in sorted(fallback)
+              if not scan_repo(session, repo, batcher, since, until, author=username, all_branches=all_branches,
+                               headers=headers, warn=warn, status=status)}
+    covered = (matched | fallback) - failed
+
+    if missed:
+        # One per-repo pass over the span of the missed windows (SHAs already fetched are de-duplicated)
+        lo, hi = min(w[0] for w in missed), max(w[1] for w in missed)
+        warn(f"Commit search is rate limited; scanning repositories individually for {lo:%Y-%m-%d} to {hi:%Y-%m-%d}.")
+        status("Listing repositories...")
+        try:
+            repos = list_repos(session, username, headers, authenticated="Authorization" in (headers or {}))
+        except RuntimeError as e:
+            warn(f"Could not list repositories ({e}); commits from {lo:%Y-%m-%d} to {hi:%Y-%m-%d} may be missing.")
+            return covered - matched # Their search hits stop short of the missed windows
+        lo_iso = lo.strftime('%Y-%m-%dT00:00:00Z')
+        hi_iso = (hi + timedelta(days=1)).strftime('%Y-%m-%dT00:00:00Z')
+        # No pushes since the window start means no commits in it (same test as repo_catalog.inactive_repos)
+        active = sorted(r["full_name"] for r in repos if not r["pushed_at"] or r["pushed_at"] >= lo_iso)
+        for repo in active:
+            if scan_repo(session, repo, batcher, lo_iso, hi_iso, author=username, all_branches=all_branches,
+                         headers=headers, warn=warn, status=status):
+                covered.add(repo)
+            else:
+                covered.discard(repo)
+    return covered
@@ -0,0 +1,256 @@
+"""
+Adaptive model routing for Groq chat completions.
+
+Each model keeps rolling telemetry over its last WINDOW calls: latency
+(p50/p95), 429 rate, JSON parse failures and completion tokens per second.
+For every batch the router ranks the models by that telemetry and tries them in
+order. A model that returns 429 is put on cooldown (Retry-After when Groq
+sends it) and the next model is tried instead of sleeping. A 5xx or network
+error is retried after the same short backoff; a 4xx client error (bad request,
+decommissioned model) benches the model for ERROR_COOLDOWN_S. A model that
+has only failed ranks last. When a call runs
+past the model's observed p95, a hedged copy of the request is sent to the
+next-best model and whichever answers first wins.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import tracing
+
+MODELS = ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"]
+WINDOW = 50
+MIN_SAMPLES_FOR_HEDGE = 5
+# A model with this many failures and no success in the window is ranked last
+MIN_FAILURES_UNMEASURED = 3
+# 4xx client errors (bad request, decommissioned model...) bench a model for this long
+ERROR_COOLDOWN_S = 60
+
+
+def _is_rate_limit(e):
+    return "429" in str(e) or getattr(e, "status_code", None) == 429
+
+
+def _is_client_error(e):
+    """A 4xx other than 429: the request or the model is bad, so retrying soon won't help."""
+    status = getattr(e, "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+def _retry_after(e, default):
+    response = getattr(e, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return default
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class ModelStats:
+    """Rolling telemetry for one model."""
+
+    def __init__(self, window=WINDOW):
+        self.latencies = deque(maxlen=window)      # seconds, successful calls only
+        self.outcomes = deque(maxlen=window)       # "ok" | "429" | "error"
+        self.json_results = deque(maxlen=window)   # True if the reply parsed
+        self.tokens_per_s = deque(maxlen=window)
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.hedges = 0       # times a backup copy of a slow call on this model was started
+        self.hedges_won = 0
+
+    def rate(self, outcome):
+        return self.outcomes.count(outcome) / len(self.outcomes) if self.outcomes else 0.0
+
+    def json_failure_rate(self):
+        return self.json_results.count(False) / len(self.json_results) if self.json_results else 0.0
+
+    def p50(self):
+        return _percentile(self.latencies, 0.50)
+
+    def p95(self):
+        return _percentile(self.latencies, 0.95)
+
+    def score(self):
+        """Expected seconds per usable answer; lower is better."""
+        p50 = self.p50()
+        if p50 is None:
+            if "ok" not in self.outcomes and len(self.outcomes) >= MIN_FAILURES_UNMEASURED:
+                return float("inf") # Only ever failed: last resort
+            return 0.0 # Unmeasured: try it so it gets some samples
+        return p50 * (1 + 4 * self.rate("429") + 2 * self.rate("error") + 2 * self.json_failure_rate())
+
+
+class ModelRouter:
+    """Thread-safe; meant to be shared process-wide (see get_model_router in app.py)."""
+
+    def __init__(self, models=MODELS, window=WINDOW):
+        self.models = list(models)
+        self.stats = {m: ModelStats(window) for m in self.models}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="groq-hedge")
+
+    # --- Ranking ---
+    def ranked_models(self):
+        now = time.time()
+        with self._lock:
+            order = {m: i for i, m in enumerate(self.models)}
+            return sorted(
+                self.models,
+                key=lambda m: (self.stats[m].cooldown_until > now, self.stats[m].score(), order[m]),
+            )
+
+    # --- Telemetry ---
+    def _record_success(self, model, latency, response):
+        usage = getattr(response, "usage", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        with self._lock:
+            s = self.stats[model]
+            s.calls += 1
+            s.outcomes.append("ok")
+            s.latencies.append(latency)
+            if completion_tokens and latency > 0:
+                s.tokens_per_s.append(completion_tokens / latency)
+
+    def _record_failure(self, model, e, backoff):
+        with self._lock:
+            s = self.stats[model]
+            s.calls += 1
+            if _is_rate_limit(e):
+                s.outcomes.append("429")
+                s.cooldown_until = max(s.cooldown_until, time.time() + _retry_after(e, backoff))
+            else:
+                s.outcomes.append("error")
+                # 5xx, timeouts and dropped connections are usually transient
+                pause = ERROR_COOLDOWN_S if _is_client_error(e) else backoff
+                s.cooldown_until = max(s.cooldown_until, time.time() + pause)
+
+    def record_json_result(self, model, ok):
+        """Called by the caller once it has tried to parse the model's reply."""
+        with self._lock:
+            self.stats[model].json_results.append(ok)
+
+    # --- Calls ---
+    def _call(self, client, model, prompt, backoff):
+        t0 = time.perf_counter()
+        tracing.count("llm_calls")
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=6000, # More tokens for batch response
+                response_format={"type": "json_object"} # STRICT JSON MODE
+            )
+        except Exception as e:
+            tracing.record(f"llm {model}", t0, outcome="429" if _is_rate_limit(e) else "error")
+            tracing.count("llm_429" if _is_rate_limit(e) else "llm_errors")
+            self._record_failure(model, e, backoff)
+            raise
+        tracing.record(f"llm {model}", t0, outcome="ok")
+        usage = getattr(response, "usage", None)
+        tracing.count("llm_prompt_tokens", getattr(usage, "prompt_tokens", None) or 0)
+        tracing.count("llm_completion_tokens", getattr(usage, "completion_tokens", None) or 0)
+        self._record_success(model, time.perf_counter() - t0, response)
+        return response
+
+    def _call_hedged(self, client, model, prompt, backup, backoff):
+        """Runs `model`; if it outlives its p95, races a copy on `backup`. Returns (response, model)."""
+        with self._lock:
+            s = self.stats[model]
+            hedge_after = s.p95() if len(s.latencies) >= MIN_SAMPLES_FOR_HEDGE else None
+
+        primary = self._pool.submit(self._call, client, model, prompt, backoff)
+        if backup is None or hedge_after is None:
+            return primary.result(), model
+
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result(), model
+
+        with self._lock:
+            s.hedges += 1
+        tracing.count("llm_hedges")
+        secondary = self._pool.submit(self._call, client, backup, prompt, backoff)
+        futures = {primary: model, secondary: backup}
+        pending = set(futures)
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    if f is secondary:
+                        with self._lock:
+                            self.stats[backup].hedges_won += 1
+                    # The loser keeps running in the pool; its telemetry is still recorded
+                    return f.result(), futures[f]
+                last_error = f.exception()
+        raise last_error
+
+    def request(self, client, prompt, retries=3):
+        """
+        Returns (response, model) or (None, None) if every model failed.
+        Models are tried best-first; 429s and transient errors put a model on a
+        short cooldown and move on, only sleeping when every model is cooling down.
+        """
+        attempts = {m: 0 for m in self.models}
+        while True:
+            now = time.time()
+            candidates = [m for m in self.ranked_models() if attempts[m] < retries]
+            if not candidates:
+                return None, None
+
+            ready = [m for m in candidates if self.stats[m].cooldown_until <= now]
+            if not ready:
+                wait_time = min(self.stats[m].cooldown_until for m in candidates) - now
+                print(f"All models cooling down. Waiting {wait_time:.1f}s...")
+                with tracing.span("rate-limit wait"):
+                    time.sleep(max(wait_time, 0.1))
+                continue
+
+            model = ready[0]
+            backup = ready[1] if len(ready) > 1 else None
+            attempts[model] += 1
+            backoff = 2 ** attempts[model] # 2, 4, 8 seconds when Groq sends no Retry-After
+            try:
+                return self._call_hedged(client, model, prompt, backup, backoff)
+            except Exception as e:
+                if _is_rate_limit(e):
+                    print(f"Rate limit on {model} (attempt {attempts[model]}/{retries}).")
+                elif _is_client_error(e):
+                    print(f"Error on {model}: {e}")
+                    attempts[model] = retries # Don't retry client errors on this model
+                else:
+                    print(f"Error on {model} (attempt {attempts[model]}/{retries}): {e}")
+
+    # --- Reporting ---
+    def metrics_rows(self):
+        now = time.time()
+        rows = []
+        with self._lock:
+            for m in self.models:
+                s = self.stats[m]
+                p50, p95 = s.p50(), s.p95()
+                tps = sum(s.tokens_per_s) / len(s.tokens_per_s) if s.tokens_per_s else None
+                rows.append({
+                    "Model": m,
+                    "Calls": s.calls,
+                    "p50 (s)": round(p50, 2) if p50 is not None else None,
+                    "p95 (s)": round(p95, 2) if p95 is not None else None,
+                    "429 rate": round(s.rate("429"), 2),
+                    "Error rate": round(s.rate("error"), 2),
+                    "JSON fail rate": round(s.json_failure_rate(), 2),
+                    "Tokens/s": round(tps, 1) if tps is not None else None,
+                    "Hedges": s.hedges,
+                    "Hedges won": s.hedges_won,
+                    "Cooldown (s)": round(max(0.0, s.cooldown_until - now), 1),
+                })
+        return rows
@@ -0,0 +1,238 @@
+"""
+Placement log store (my_placement_logs.csv).
+
+Rows are keyed by (Date, Source). Source is where the entry came from:
+"git", "daily" or "weekly", and "" for rows saved before sources were
+recorded. Saving an entry whose key already exists replaces that row, so
+re-importing an overlapping Git range no longer piles up duplicates. A batch
+is upserted through a key -> row dict (O(1) per entry) and written once.
+
+The History tab reads through query_logs() and the week/month summaries. They
+run on the cached frame, with derived views (sorted order, project index,
+conflicting dates, aggregates) built once per store version, and copy out only the requested page.
+"""
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+import tracing
+
+FILE_NAME = "my_placement_logs.csv"
+COLUMNS = ["Date", "Day", "Week_Ending", "Activity_Code", "Description", "Problems", "Solutions", "Project", "Source"]
+KEY = ["Date", "Source"]
+
+# Parsed store, reused while the file on disk is unchanged (path, mtime, size)
+_cache = {"stamp": None, "df": None}
+# Views derived from _cache["df"]; dropped whenever that frame is replaced
+_views = {"df": None}
+
+
+def _file_stamp():
+    st = os.stat(FILE_NAME)
+    return (os.path.abspath(FILE_NAME), st.st_mtime_ns, st.st_size)
+
+
+def _normalize(df):
+    for col in COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    # Older rows stored full datetimes ("2025-01-02 00:00:00"); the key uses the day only
+    df["Date"] = df["Date"].astype(str).str.slice(0, 10)
+    return df
+
+
+def _load():
+    """The cached store frame itself. Read-only: callers outside this module use load_data()."""
+    if not os.path.exists(FILE_NAME):
+        pd.DataFrame(columns=COLUMNS).to_csv(FILE_NAME, index=False)
+
+    stamp = _file_stamp()
+    if _cache["stamp"] != stamp:
+        tracing.count("log_store_cache_misses")
+        _cache["df"] = _normalize(pd.read_csv(FILE_NAME, dtype=str, keep_default_na=False))
+        _cache["stamp"] = stamp
+    else:
+        tracing.count("log_store_cache_hits")
+    return _cache["df"]
+
+
+def load_data():
+    # Callers add helper columns (e.g. fill_excel_sheet), so never hand out the cached frame
+    return _load().copy()
+
+
+def _text(value):
+    """Blank for None/NaN (data_editor cells), the value otherwise."""
+    return value if isinstance(value, str) or (value is not None and pd.notna(value)) else ""
+
+
+def make_entry(date_obj, activity_code, desc, prob, sol, project="", source="daily"):
+    day_name = date_obj.strftime("%A")
+    # Logic: Week ends on the upcoming Sunday
+    days_ahead = 6 - date_obj.weekday()
+    week_ending = date_obj + timedelta(days=days_ahead)
+
+    return {
+        "Date": date_obj.strftime("%Y-%m-%d"),
+        "Day": day_name.upper(),
+        "Week_Ending": week_ending.strftime("%Y-%m-%d"),
+        "Activity_Code": activity_code,
+        "Description": desc,
+        "Problems": _text(prob),
+        "Solutions": _text(sol),
+        "Project": _text(project),
+        "Source": source,
+    }
+
+
+def upsert_entries(entries):
+    """
+    Inserts or replaces entries by (Date, Source). Returns (inserted, updated).
+    """
+    df = load_data()
+    records = df.to_dict("records")
+    # Key index: last row wins if older data already holds duplicates
+    index = {(r["Date"], r["Source"]): i for i, r in enumerate(records)}
+
+    inserted = updated = 0
+    for entry in entries:
+        key = (entry["Date"], entry["Source"])
+        pos = index.get(key)
+        if pos is None:
+            index[key] = len(records)
+            records.append(entry)
+            inserted += 1
+        else:
+            records[pos] = entry
+            updated += 1
+
+    new_df = pd.DataFrame(records, columns=COLUMNS)
+    new_df.to_csv(FILE_NAME, index=False)
+    # The next load_data() reuses this frame instead of re-parsing the file we just wrote
+    _cache["df"], _cache["stamp"] = new_df, _file_stamp()
+    return inserted, updated
+
+
+def save_entry(date_obj, activity_code, desc, prob, sol, project="", source="daily"):
+    return upsert_entries([make_entry(date_obj, activity_code, desc, prob, sol, project, source)])
+
+
+# --- QUERIES (History tab) ---
+def _view(name, build):
+    """A view of the current store, built on first use and reused until the store changes."""
+    df = _load()
+    if _views["df"] is not df:
+        _views.clear()
+        _views["df"] = df
+    if name not in _views:
+        _views[name] = build(df)
+    return _views[name]
+
+
+def _sorted(df):
+    # Newest first; ties in source order so pages are stable
+    return df.sort_values(["Date", "Source"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+
+def _project_index(_):
+    """(row position in the sorted view, single project) pairs; Project may hold "a/b, c/d"."""
+    projects = _view("sorted", _sorted)["Project"].str.split(",").explode().str.strip()
+    return projects[projects != ""]
+
+
+def _conflict_mask(_):
+    """Rows of the sorted view sharing a Date with another row (different sources, or legacy duplicates)."""
+    return _view("sorted", _sorted)["Date"].duplicated(keep=False).to_numpy()
+
+
+def conflict_summary():
+    """Number of dates with more than one entry, and the rows involved."""
+    def build(_):
+        mask = _view("conflicts", _conflict_mask)
+        dates = _view("sorted", _sorted)["Date"][mask]
+        return {"dates": dates.nunique(), "rows": int(mask.sum())}
+    return _view("conflict_summary", build)
+
+
+def _day(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def filter_options():
+    """Distinct weeks (newest first), activity codes, projects and sources, plus the first/last logged day."""
+    def build(df):
+        dates = pd.to_datetime(df["Date"], errors="coerce").dropna()
+        return {
+            "weeks": sorted(df["Week_Ending"].replace("", pd.NA).dropna().unique(), reverse=True),
+            "codes": sorted(df["Activity_Code"].replace("", pd.NA).dropna().unique()),
+            "projects": sorted(_view("projects", _project_index).unique()),
+            "sources": sorted(df["Source"].unique()),
+            "first_day": dates.min().date() if not dates.empty else None,
+            "last_day": dates.max().date() if not dates.empty else None,
+        }
+    return _view("options", build)
+
+
+def query_logs(start=None, end=None, weeks=None, codes=None, projects=None, sources=None,
+               conflicts_only=False, page=1, page_size=50, ascending=False):
+    """
+    One page of the store matching every given filter, newest first unless `ascending`.
+    `conflicts_only` keeps rows whose Date also has another entry (see conflict_summary).
+    Returns (page DataFrame, total matching rows). `page` is clamped to the last page.
+    """
+    df = _view("sorted", _sorted)
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= (df["Date"] >= _day(start)).to_numpy()
+    if end is not None:
+        mask &= (df["Date"] <= _day(end)).to_numpy()
+    if weeks:
+        mask &= df["Week_Ending"].isin(list(weeks)).to_numpy()
+    if codes:
+        mask &= df["Activity_Code"].isin(list(codes)).to_numpy()
+    if sources:
+        mask &= df["Source"].isin(list(sources)).to_numpy()
+    if projects:
+        index = _view("projects", _project_index)
+        has_project = np.zeros(len(df), dtype=bool)
+        has_project[index.index[index.isin(list(projects))]] = True
+        mask &= has_project
+    if conflicts_only:
+        mask &= _view("conflicts", _conflict_mask)
+
+    positions = np.flatnonzero(mask)
+    if ascending:
+        positions = positions[::-1]
+    total = len(positions)
+    last_page = max(1, -(-total // page_size))
+    first = (min(max(page, 1), last_page) - 1) * page_size
+    return df.iloc[positions[first:first + page_size]].reset_index(drop=True), total
+
+
+def _summary(df, key):
+    """Entries, distinct days, sources and most frequent activity code per `key` value."""
+    frame = df.assign(_key=key)
+    grouped = frame.groupby("_key")
+    top_code = (frame.groupby(["_key", "Activity_Code"]).size().rename("n").reset_index()
+                .sort_values(["n", "Activity_Code"], ascending=[False, True])
+                .drop_duplicates("_key").set_index("_key")["Activity_Code"])
+    sources = frame[["_key", "Source"]].drop_duplicates().sort_values("Source").groupby("_key")["Source"].agg(", ".join)
+    out = pd.DataFrame({
+        "Entries": grouped.size(),
+        "Days": grouped["Date"].nunique(),
+        "Top_Code": top_code,
+        "Sources": sources,
+    })
+    return out.sort_index(ascending=False)
+
+
+def week_summary():
+    """Per Week_Ending aggregates (newest first), computed once per store version."""
+    return _view("weeks", lambda df: _summary(df, df["Week_Ending"]).rename_axis("Week_Ending").reset_index())
+
+
+def month_summary():
+    """Per month (YYYY-MM) aggregates (newest first), computed once per store version."""
+    return _view("months", lambda df: _summary(df, df["Date"].str.slice(0, 7)).rename_axis("Month").reset_index())
@@ -0,0 +1,128 @@
+"""
+Startup profiler for app.py.
+
+Each measurement runs in a fresh interpreter so nothing is already cached:
+  * import time of every heavy dependency on its own
+  * a cold start of app.py (first script run through Streamlit's AppTest harness)
+The report also lists which heavy modules the cold start actually pulled in,
+so a dependency that should be lazy but is imported at the top shows up.
+
+Usage:
+    python profile_startup.py [--budget 3.0] [--runs 3] [--json startup_report.json]
+
+Exits with status 1 if the median cold start is over budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+HEAVY_MODULES = ["pandas", "groq", "openpyxl", "requests", "dotenv", "pyarrow"]
+DEFAULT_BUDGET_S = 3.0
+
+IMPORT_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+try:
+    __import__(sys.argv[1])
+    print(json.dumps({"seconds": time.perf_counter() - t0}))
+except ImportError as e:
+    print(json.dumps({"error": str(e)}))
+"""
+
+COLD_START_PROBE = """
+import json, sys, time
+heavy = sys.argv[2].split(",")
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+before = set(sys.modules)
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+t2 = time.perf_counter()
+loaded = sorted(m for m in heavy if m in sys.modules and m not in before)
+print(json.dumps({
+    "streamlit_import_s": t1 - t0,
+    "script_run_s": t2 - t1,
+    "total_s": t2 - t0,
+    "heavy_loaded_by_app": loaded,
+    "exceptions": [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def run_probe(code, args, cwd):
+    out = subprocess.run(
+        [sys.executable, "-c", code] + args,
+        cwd=cwd, capture_output=True, text=True, timeout=300,
+    )
+    # Streamlit logs warnings to stdout in bare mode; the report is the last line
+    lines = [l for l in out.stdout.strip().splitlines() if l.startswith("{")]
+    if not lines:
+        raise RuntimeError(f"Probe failed:\n{out.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def profile(runs=3):
+    report = {"imports": {}, "cold_start": []}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Run from an empty directory so the app starts from a clean log store
+        for mod in HEAVY_MODULES:
+            report["imports"][mod] = run_probe(IMPORT_PROBE, [mod], tmp)
+
+        for _ in range(runs):
+            report["cold_start"].append(
+                run_probe(COLD_START_PROBE, [APP_PATH, ",".join(HEAVY_MODULES)], tmp)
+            )
+
+    report["median_total_s"] = statistics.median(r["total_s"] for r in report["cold_start"])
+    report["median_script_run_s"] = statistics.median(r["script_run_s"] for r in report["cold_start"])
+    return report
+
+
+def print_report(report, budget):
+    print("Dependency import cost (fresh interpreter each):")
+    for mod, res in report["imports"].items():
+        if "error" in res:
+            print(f"  {mod:<10} not installed")
+        else:
+            print(f"  {mod:<10} {res['seconds'] * 1000:8.1f} ms")
+
+    print("\nCold start of app.py:")
+    for i, r in enumerate(report["cold_start"], 1):
+        print(f"  run {i}: streamlit {r['streamlit_import_s']:.2f}s + script {r['script_run_s']:.2f}s"
+              f" = {r['total_s']:.2f}s")
+        if r["exceptions"]:
+            print(f"    ! app raised: {r['exceptions']}")
+
+    loaded = report["cold_start"][-1]["heavy_loaded_by_app"]
+    print(f"\nHeavy modules imported by the first run: {', '.join(loaded) or 'none'}")
+    status = "OK" if report["median_total_s"] <= budget else "OVER BUDGET"
+    print(f"Median cold start: {report['median_total_s']:.2f}s (budget {budget:.2f}s) -> {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile app.py cold start against a time budget.")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S, help="Cold start budget in seconds.")
+    parser.add_argument("--runs", type=int, default=3, help="Number of cold starts to measure.")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file.")
+    args = parser.parse_args()
+
+    report = profile(args.runs)
+    report["budget_s"] = args.budget
+    print_report(report, args.budget)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    sys.exit(0 if report["median_total_s"] <= args.budget else 1)
+
+
+if __name__ == "__main__":
+    main()
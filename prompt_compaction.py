@@ -0,0 +1,131 @@
+"""
+Prompt compaction for the Groq summarizer.
+
+Before a day's commits are sent to the LLM:
+  * merge commits, reverts, auto-generated commits and commits by bot accounts (login ending in [bot]) are dropped
+  * near-duplicate subjects ("fix typo", "Fix typo.", "fix typo #2") collapse into one line with a count
+  * bodies are cut to their first MAX_BODY_CHARS characters on a single line
+  * "owner/repo" becomes a short alias and is written once per repo, not once per commit
+
+Token counts are estimated at ~4 characters per token, which is close enough
+to compare before/after for English commit text.
+"""
+import re
+
+MAX_BODY_CHARS = 120
+CHARS_PER_TOKEN = 4
+
+NOISE_PATTERNS = re.compile(
+    # Only at the start of the subject
+    r"^(?:merge (?:pull request|branch|remote-tracking branch|tag)\b"
+    r"|revert \""
+    r"|bump \S+ from \S+ to \S+"
+    r"|chore\(deps(?:-dev)?\):"
+    r"|update (?:readme|changelog)(?:\.md)?$)"
+    # Anywhere in the subject
+    r"|\bauto[- ]?generated\b"
+    r"|\[bot\]"
+    r"|\[skip ci\]",
+    re.IGNORECASE,
+)
+# Things that make otherwise identical subjects look different
+_NORMALIZE_STRIP = re.compile(r"(#\d+|\b[0-9a-f]{7,40}\b|\d+|[^\w\s])", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def is_bot(author):
+    """GitHub Apps commit as "<name>[bot]" (dependabot[bot], github-actions[bot], ...)."""
+    return isinstance(author, str) and author.lower().endswith("[bot]")
+
+
+def is_noise(message, author=None):
+    if is_bot(author):
+        return True
+    subject = message.strip().split("\n", 1)[0]
+    return bool(NOISE_PATTERNS.search(subject))
+
+
+def _normalize_subject(subject):
+    return _WHITESPACE.sub(" ", _NORMALIZE_STRIP.sub(" ", subject.lower())).strip()
+
+
+def _shorten(message):
+    subject, _, body = message.strip().partition("\n")
+    subject = subject.strip()
+    body = _WHITESPACE.sub(" ", body).strip()
+    if body:
+        if len(body) > MAX_BODY_CHARS:
+            body = body[:MAX_BODY_CHARS].rstrip() + "…"
+        return subject, f"{subject} — {body}"
+    return subject, subject
+
+
+def build_repo_aliases(repos):
+    """'owner/repo' -> 'repo'; keeps the owner only where two repos share a name."""
+    repos = sorted(set(repos))
+    names = [r.split("/")[-1] for r in repos]
+    return {r: (n if names.count(n) == 1 else r) for r, n in zip(repos, names)}
+
+
+def original_day_text(date_str, commits):
+    """The uncompacted prompt block, as the app used to build it."""
+    msgs_with_repo = [f"[{c['repo']}] {c['message']}" for c in commits]
+    return f"Date: {date_str}\nCommits:\n" + "\n".join(f"- {m}" for m in msgs_with_repo)
+
+
+def compact_day(date_str, commits, aliases):
+    """
+    Returns (prompt_block, stats) for one day's commits.
+    stats: date, commits, dropped, collapsed, tokens_before, tokens_after.
+    """
+    # Cached commits carry no author; those are judged by their subject alone
+    kept = [c for c in commits if not is_noise(str(c["message"]), c.get("author"))]
+    if not kept:
+        # A day of only merges still says something; keep their subjects rather than lose the day
+        kept = commits
+    dropped = len(commits) - len(kept)
+
+    # repo -> {normalized subject: [line, count]}, in first-seen order
+    by_repo = {}
+    for c in kept:
+        subject, line = _shorten(str(c["message"]))
+        key = _normalize_subject(subject) or subject
+        entries = by_repo.setdefault(c["repo"], {})
+        if key in entries:
+            entries[key][1] += 1
+        else:
+            entries[key] = [line, 1]
+
+    lines = [f"Date: {date_str}"]
+    collapsed = 0
+    for repo, entries in by_repo.items():
+        lines.append(f"[{aliases.get(repo, repo)}]")
+        for line, count in entries.values():
+            collapsed += count - 1
+            lines.append(f"- {line}" + (f" (x{count})" if count > 1 else ""))
+    block = "\n".join(lines)
+
+    stats = {
+        "date": date_str,
+        "commits": len(commits),
+        "dropped": dropped,
+        "collapsed": collapsed,
+        "tokens_before": estimate_tokens(original_day_text(date_str, commits)),
+        "tokens_after": estimate_tokens(block),
+    }
+    return block, stats
+
+
+def compact_batch(commits_by_date, batch_dates):
+    """Compacts several days for one prompt. Returns (text, aliases, [stats per day])."""
+    aliases = build_repo_aliases(c["repo"] for d in batch_dates for c in commits_by_date[d])
+    blocks, stats = [], []
+    for d_str in batch_dates:
+        block, day_stats = compact_day(d_str, commits_by_date[d_str], aliases)
+        blocks.append(block)
+        stats.append(day_stats)
+    return "\n\n".join(blocks), aliases, stats
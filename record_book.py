@@ -0,0 +1,275 @@
+"""
+Excel record book filling.
+Lives outside app.py so openpyxl is only imported once the Excel tab is used.
+"""
+import copy
+import time
+from datetime import timedelta
+from io import BytesIO
+
+import openpyxl
+import pandas as pd
+from openpyxl.styles import Alignment
+
+import tracing
+
+
+def get_writeable_cell(ws, row, col):
+    """
+    Returns the writeable cell (top-left) if the target is a merged cell.
+    """
+    cell = ws.cell(row=row, column=col)
+    if isinstance(cell, openpyxl.cell.cell.MergedCell):
+        for merged_range in ws.merged_cells.ranges:
+            if (col >= merged_range.min_col and col <= merged_range.max_col and
+                row >= merged_range.min_row and row <= merged_range.max_row):
+                return ws.cell(row=merged_range.min_row, column=merged_range.min_col)
+    return cell
+
+def copy_range(ws, src_min_row, src_max_row, src_min_col, src_max_col, dest_min_row):
+    """
+    Copies a range of cells (values + styles + merges) to a new row offset.
+    Returns the number of rows copied.
+    """
+    rows_count = src_max_row - src_min_row + 1
+    dest_max_row = dest_min_row + rows_count - 1
+    dest_min_col = src_min_col
+    dest_max_col = src_max_col
+    
+    # 0. Cleanup Destination Merges
+    # If the destination has existing merges, we must unmerge them first to allow writing values.
+    # Otherwise we hit 'MergedCell' read-only errors.
+    for merged_range in list(ws.merged_cells.ranges):
+        # Check for overlap
+        if (merged_range.min_row <= dest_max_row and merged_range.max_row >= dest_min_row and
+            merged_range.min_col <= dest_max_col and merged_range.max_col >= dest_min_col):
+            try:
+                ws.unmerge_cells(start_row=merged_range.min_row, start_column=merged_range.min_col,
+                                 end_row=merged_range.max_row, end_column=merged_range.max_col)
+            except KeyError:
+                # Cell might be missing from internal index if rows were deleted beforehand
+                pass
+
+    # 1. Copy Cells
+    for row_offset in range(rows_count):
+        src_row = src_min_row + row_offset
+        dest_row = dest_min_row + row_offset
+        
+        for col in range(src_min_col, src_max_col + 1):
+            src_cell = ws.cell(row=src_row, column=col)
+            dest_cell = ws.cell(row=dest_row, column=col)
+            
+            # Copy value
+            dest_cell.value = src_cell.value
+            
+            # Copy style (simplified: alignment, font, border, fill)
+            if src_cell.has_style:
+                dest_cell.font = copy.copy(src_cell.font)
+                dest_cell.border = copy.copy(src_cell.border)
+                dest_cell.fill = copy.copy(src_cell.fill)
+                dest_cell.number_format = copy.copy(src_cell.number_format)
+                dest_cell.protection = copy.copy(src_cell.protection)
+                dest_cell.alignment = copy.copy(src_cell.alignment)
+
+    # 2. Copy Merged Cells
+    # We need to find merges in the source range and map them to the dest range
+    # Iterate over a COPY of the ranges because merge_cells modifies the collection
+    for merged_range in list(ws.merged_cells.ranges):
+        if (merged_range.min_row >= src_min_row and 
+            merged_range.max_row <= src_max_row and
+            merged_range.min_col >= src_min_col and 
+            merged_range.max_col <= src_max_col):
+            
+            # Calculate offset
+            offset_row = dest_min_row - src_min_row
+            
+            new_min_row = merged_range.min_row + offset_row
+            new_max_row = merged_range.max_row + offset_row
+            new_min_col = merged_range.min_col
+            new_max_col = merged_range.max_col
+            
+            ws.merge_cells(start_row=new_min_row, start_column=new_min_col, 
+                           end_row=new_max_row, end_column=new_max_col)
+            
+    return rows_count
+
+def fill_excel_sheet(template_file, data_df, start_date, end_date, output_path=None):
+    """
+    Refactored to:
+    1. Create one sheet per Month between start_date and end_date.
+    2. Dynamically generate 4 or 5 tables per sheet based on Sundays.
+    3. Fill tables with data for that month.
+    """
+    with tracing.span("load template"):
+        wb = openpyxl.load_workbook(template_file)
+    
+    # Identify Template Sheet
+    if 'Logs' in wb.sheetnames:
+        template_ws = wb['Logs']
+    else:
+        template_ws = wb.active
+        
+    template_ws.title = "Template" # Rename for clarity
+    
+    # --- 1. Identify Template Range ---
+    start_row = None
+    for row in range(1, 100):
+        c = template_ws.cell(row=row, column=1)
+        if c.value and "WEEK ENDING" in str(c.value).upper():
+            start_row = row
+            break
+            
+    if not start_row:
+        return None, "Could not find 'WEEK ENDING' in the template."
+
+    TEMPLATE_ROW_COUNT = 21 # Assumed block size
+    
+    # Convert dates
+    data_df['Week_Ending_Dt'] = pd.to_datetime(data_df['Week_Ending'])
+    
+    current_date = start_date.replace(day=1)
+    
+    # Iterate Months
+    while current_date <= end_date:
+        month_name = current_date.strftime("%b %Y")
+        t_month = time.perf_counter()
+        
+        # Create new sheet from template
+        new_ws = wb.copy_worksheet(template_ws)
+        new_ws.title = month_name
+        
+        # --- CLEANUP: Keep only the first template block ---
+        # We assume the first block (start_row to +TEMPLATE_ROW_COUNT) is the master.
+        # Delete everything below it to avoid junk from the template file.
+        cutoff_row = start_row + TEMPLATE_ROW_COUNT
+        rows_to_delete = new_ws.max_row - cutoff_row + 10
+        if rows_to_delete > 0:
+            new_ws.delete_rows(cutoff_row, amount=rows_to_delete)
+        
+        # Get Sundays in this month
+        # Start from 1st of month
+        curr_mon = current_date
+        next_mon = (curr_mon.replace(day=28) + timedelta(days=4)).replace(day=1) # Advance to next month 1st
+        
+        # Find first Sunday
+        d = curr_mon
+        while d.weekday() != 6: # 6 = Sunday
+            d += timedelta(days=1)
+            
+        month_sundays = []
+        while d < next_mon:
+            month_sundays.append(d)
+            d += timedelta(days=7)
+            
+        # Target Sundays is ALL of them (4 or 5)
+        target_sundays = month_sundays
+        num_tables = len(target_sundays)
+        
+        # Determine table positions
+        tables_start_rows = []
+        for i in range(num_tables):
+            tables_start_rows.append(start_row + (TEMPLATE_ROW_COUNT + 1) * i)
+        
+        # Copy template to additional positions
+        # Note: Position 0 is already there (from the sheet copy).
+        # We copy for i=1 to N-1
+        with tracing.span("copy blocks", month=month_name):
+            for t_row in tables_start_rows[1:]:
+                copy_range(new_ws, start_row, start_row + TEMPLATE_ROW_COUNT - 1, 1, 20, t_row)
+        tracing.count("excel_blocks_copied", len(tables_start_rows) - 1)
+        
+        # Fill Tables
+        day_map = {
+            "MONDAY": 2, "TUESDAY": 3, "WEDNESDAY": 4, 
+            "THURSDAY": 5, "FRIDAY": 6, "SATURDAY": 7, "SUNDAY": 8
+        }
+        
+        for idx, t_row in enumerate(tables_start_rows):
+            # Clear critical cells first (Date, Desc, Code, Probs) - in case Template had junk
+            # Date
+            c = get_writeable_cell(new_ws, t_row, 2)
+            if c: c.value = None
+            
+            # Prob/Sol
+            c = get_writeable_cell(new_ws, t_row + 10, 2)
+            if c: c.value = None
+            c = get_writeable_cell(new_ws, t_row + 10, 3)
+            if c: c.value = None
+            
+            # Days
+            for i in range(2, 9):
+                c = get_writeable_cell(new_ws, t_row + i, 2)
+                if c: c.value = None
+                c = get_writeable_cell(new_ws, t_row + i, 3)
+                if c: c.value = None
+
+            if idx < len(target_sundays):
+                week_dt = target_sundays[idx]
+                week_str = week_dt.strftime("%Y-%m-%d")
+                
+                # Fill Date
+                date_cell = get_writeable_cell(new_ws, t_row, 2)
+                if date_cell:
+                    date_cell.value = week_str
+                    date_cell.alignment = Alignment(horizontal='left')
+                
+                # Fill Data
+                week_data = data_df[data_df['Week_Ending'] == week_str]
+                tracing.count("excel_entries_filled", len(week_data))
+                if not week_data.empty:
+                    problems_list = []
+                    solutions_list = []
+                    for _, row_data in week_data.iterrows():
+                        day_offset = day_map.get(row_data['Day'], None)
+                        if day_offset:
+                            cell_desc = get_writeable_cell(new_ws, t_row + day_offset, 2)
+                            if cell_desc:
+                                # Append Project Name if available
+                                desc_text = row_data['Description']
+                                if 'Project' in row_data and pd.notna(row_data['Project']) and row_data['Project']:
+                                     desc_text = f"[{row_data['Project']}] {desc_text}"
+                                
+                                cell_desc.value = desc_text
+                                cell_desc.alignment = Alignment(wrap_text=True, vertical='top')
+
+                            cell_code = get_writeable_cell(new_ws, t_row + day_offset, 3)
+                            if cell_code:
+                                cell_code.value = row_data['Activity_Code']
+                                cell_code.alignment = Alignment(horizontal='center', vertical='top')
+                            
+                            if pd.notna(row_data['Problems']) and str(row_data['Problems']).strip():
+                                problems_list.append(str(row_data['Problems']))
+                            if pd.notna(row_data['Solutions']) and str(row_data['Solutions']).strip():
+                                solutions_list.append(str(row_data['Solutions']))
+
+                    if problems_list:
+                        cell = get_writeable_cell(new_ws, t_row + 10, 2)
+                        if cell:
+                            cell.value = "\n".join(problems_list)
+                            cell.alignment = Alignment(wrap_text=True, vertical='top')
+                    if solutions_list:
+                        cell = get_writeable_cell(new_ws, t_row + 10, 3)
+                        if cell:
+                            cell.value = "\n".join(solutions_list)
+                            cell.alignment = Alignment(wrap_text=True, vertical='top')
+
+        # Advance to next month
+        tracing.record("month sheet", t_month, month=month_name)
+        current_date = next_mon
+
+    # Move Template to end or hide it?
+    # Let's just delete it to be clean, as requested "created ... tabs"
+    if 'Template' in wb.sheetnames:
+        del wb['Template']
+
+    # Save
+    if output_path:
+        with tracing.span("save workbook"):
+            wb.save(output_path)
+        return None, "Saved directly to file."
+    
+    output = BytesIO()
+    with tracing.span("save workbook"):
+        wb.save(output)
+    output.seek(0)
+    return output, "Success"
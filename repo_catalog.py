@@ -0,0 +1,58 @@
+"""
+On-disk repository catalogue (repo_catalog.json).
+
+Holds the last repository listing with each repo's pushed_at/updated_at
+timestamps. Within TTL_SECONDS the repo selector is filled from here without
+any API call. The pushed_at times also let the importer skip repos that have
+had no pushes since the start of the chosen range. A listing taken before the
+range ended can't rule out later pushes, so those candidates are re-checked
+(see covers_range).
+"""
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+CATALOG_FILE = "repo_catalog.json"
+TTL_SECONDS = 6 * 3600
+
+
+def load_catalog(account, ttl=TTL_SECONDS):
+    """Returns (repos, age_seconds), or (None, None) if missing, stale or for another account."""
+    if not os.path.exists(CATALOG_FILE):
+        return None, None
+    try:
+        with open(CATALOG_FILE) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    age = time.time() - data.get("fetched_at", 0)
+    if data.get("account") != account or age > ttl:
+        return None, None
+    return data.get("repos", []), age
+
+
+def save_catalog(account, repos):
+    tmp_path = CATALOG_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"account": account, "fetched_at": time.time(), "repos": repos}, f)
+    os.replace(tmp_path, CATALOG_FILE)
+
+
+def covers_range(fetched_at, end_date):
+    """True if a listing taken at `fetched_at` (epoch seconds) postdates the whole range (end_date inclusive, UTC)."""
+    if not fetched_at:
+        return False
+    range_end = datetime(end_date.year, end_date.month, end_date.day, tzinfo=timezone.utc) + timedelta(days=1)
+    return fetched_at >= range_end.timestamp()
+
+
+def inactive_repos(repos, selected, start_date):
+    """
+    Selected repos whose last push is before start_date, so they can hold no commits in the range.
+    Repos missing from the catalogue (e.g. typed in manually) are never skipped.
+    """
+    start_str = start_date.strftime("%Y-%m-%d")
+    pushed = {r["full_name"]: r.get("pushed_at") for r in repos or []}
+    # ISO timestamps compare correctly as strings
+    return [name for name in selected if pushed.get(name) and pushed[name][:10] < start_str]
@@ -0,0 +1,498 @@
+"""
+Offline stand-in for the GitHub REST API and Groq chat completions.
+
+Point the app (or a benchmark) at it with:
+
+    GITHUB_API_URL=http://127.0.0.1:8766
+    GROQ_BASE_URL=http://127.0.0.1:8766
+
+Modes:
+    synthetic  Generates repos, branches, commit pages, commit search results and
+               Groq replies on the fly from a seed. Good for load tests at any scale.
+    replay     Serves responses from a cassette recorded earlier.
+    record     Proxies to api.github.com / api.groq.com and writes every response
+               to the cassette (auth headers are forwarded, never stored).
+
+Every mode can add latency, inject 429/5xx and emit rate-limit headers. Faults are
+decided from (seed, request key, how many times that key was requested), so a
+run with the same settings and the same requests fails in the same places.
+
+    python stub_server.py synthetic --repos 50 --commits 2000 --latency-ms 40 --error-rate 0.02
+    python stub_server.py record --cassette cassettes/my_run.json
+    python stub_server.py replay --cassette cassettes/my_run.json --rate-limit 60
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+GITHUB_UPSTREAM = "https://api.github.com"
+GROQ_UPSTREAM = "https://api.groq.com"
+GROQ_PREFIX = "/openai/"
+# Response headers worth keeping in a cassette
+RECORDED_HEADERS = {"content-type", "link", "retry-after"}
+SYNTH_USER = "synth-user"
+SUBJECTS = [
+    "Add {x} endpoint", "Fix {x} bug in handler", "Refactor {x} module", "Update README for {x}",
+    "Add tests for {x}", "Implement {x} page", "Fix typo in {x}", "Merge branch 'feature/{x}'",
+    "Set up Docker for {x}", "Add auth check to {x}", "Design {x} schema", "Bump {x} dependency",
+]
+TOPICS = ["login", "dashboard", "payments", "search", "profile", "upload", "reports", "settings", "cart", "api"]
+
+
+def _is_groq(path):
+    return path.startswith(GROQ_PREFIX)
+
+
+def _request_key(method, path, query, body=b""):
+    """Canonical key: method, path, sorted query, and a body hash for POSTs."""
+    key = f"{method} {path}"
+    if query:
+        key += "?" + urlencode(sorted(parse_qsl(query)))
+    if body:
+        key += " #" + hashlib.sha256(body).hexdigest()[:16]
+    return key
+
+
+def _roll(seed, key, attempt):
+    """Deterministic 0..1 draw for the attempt-th request of `key`."""
+    digest = hashlib.sha256(f"{seed}|{key}|{attempt}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+# --- FAULTS & RATE LIMITS ---
+class FaultPlan:
+    """Latency, error injection and a fixed-window rate limit shared by all modes."""
+
+    def __init__(self, seed=0, latency_ms=0, jitter_ms=0, error_rate=0.0, throttle_rate=0.0,
+                 rate_limit=0, window_s=60):
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.window_s = window_s
+        self._lock = threading.Lock()
+        self._attempts = {}
+        self._window_start = time.time()
+        self._window_used = 0
+
+    def delay(self, key, attempt):
+        if self.latency_ms or self.jitter_ms:
+            jitter = (2 * _roll(self.seed, key + "|lat", attempt) - 1) * self.jitter_ms
+            time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+    def next_attempt(self, key):
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+            return attempt
+
+    def take_quota(self):
+        """(limit, remaining, reset_epoch, allowed) for the current window."""
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.window_s:
+                self._window_start, self._window_used = now, 0
+            reset = int(self._window_start + self.window_s)
+            if not self.rate_limit:
+                return None
+            allowed = self._window_used < self.rate_limit
+            if allowed:
+                self._window_used += 1
+            return self.rate_limit, max(0, self.rate_limit - self._window_used), reset, allowed
+
+    def injected_fault(self, key, attempt):
+        """None, 429 or a 5xx status for this attempt."""
+        draw = _roll(self.seed, key, attempt)
+        if draw < self.throttle_rate:
+            return 429
+        if draw < self.throttle_rate + self.error_rate:
+            return (502, 503, 500)[int(_roll(self.seed, key + "|5xx", attempt) * 3)]
+        return None
+
+
+def rate_limit_headers(groq, limit, remaining, reset):
+    if groq:
+        return {
+            "x-ratelimit-limit-requests": str(limit),
+            "x-ratelimit-remaining-requests": str(remaining),
+            "x-ratelimit-reset-requests": f"{max(0, reset - int(time.time()))}s",
+        }
+    return {
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-reset": str(reset),
+        "x-ratelimit-used": str(limit - remaining),
+        "x-ratelimit-resource": "core",
+    }
+
+
+def error_body(groq, status):
+    if groq:
+        kind = "rate_limit_exceeded" if status == 429 else "server_error"
+        return {"error": {"message": f"Injected {status} from stub server", "type": kind}}
+    if status == 429 or status == 403:
+        return {"message": "API rate limit exceeded (stub server)"}
+    return {"message": f"Injected {status} from stub server"}
+
+
+# --- SYNTHETIC BACKEND ---
+class SyntheticBackend:
+    """
+    Deterministic fake GitHub account: `repos` repositories with `commits` commits
+    each, spread over [start, end], all authored by SYNTH_USER on one branch.
+    """
+
+    def __init__(self, repos=10, commits=500, start="2025-01-01", end="2025-06-30", seed=0):
+        self.n_repos = repos
+        self.n_commits = commits
+        self.start = datetime.fromisoformat(start).replace(tzinfo=timezone.utc)
+        self.end = datetime.fromisoformat(end).replace(tzinfo=timezone.utc) + timedelta(days=1)
+        self.seed = seed
+        self.repo_names = [f"{SYNTH_USER}/repo-{i:03d}" for i in range(repos)]
+
+    @lru_cache(maxsize=None)
+    def commits_for(self, repo):
+        """All commits of one repo as GitHub JSON, newest first."""
+        rng = random.Random(f"{self.seed}|{repo}")
+        span = (self.end - self.start).total_seconds()
+        out = []
+        for i in range(self.n_commits):
+            ts = self.start + timedelta(seconds=rng.random() * span)
+            subject = rng.choice(SUBJECTS).format(x=rng.choice(TOPICS))
+            sha = hashlib.sha1(f"{self.seed}|{repo}|{i}".encode()).hexdigest()
+            date = ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+            out.append({
+                "sha": sha,
+                "commit": {"message": subject, "author": {"name": SYNTH_USER, "date": date},
+                           "committer": {"name": SYNTH_USER, "date": date}},
+                "author": {"login": SYNTH_USER},
+            })
+        out.sort(key=lambda c: c["commit"]["author"]["date"], reverse=True)
+        return out
+
+    def _page(self, items, params, base_url, path, default_per_page=30):
+        per_page = int(params.get("per_page", default_per_page))
+        page = int(params.get("page", 1))
+        last = max(1, -(-len(items) // per_page))
+        headers = {}
+        if last > 1:
+            links = []
+            for rel, n in (("next", page + 1), ("last", last)):
+                if n <= last:
+                    links.append(f'<{base_url}{path}?{urlencode(dict(params, page=n))}>; rel="{rel}"')
+            headers["Link"] = ", ".join(links)
+        return items[(page - 1) * per_page: page * per_page], headers
+
+    def handle(self, method, path, params, body, base_url):
+        """(status, headers, json_body) for one request."""
+        if _is_groq(path):
+            return self._chat(body)
+
+        if path in ("/user/repos", f"/users/{SYNTH_USER}/repos"):
+            repos = [{"full_name": r, "pushed_at": self.end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                      "updated_at": self.end.strftime("%Y-%m-%dT%H:%M:%SZ")} for r in self.repo_names]
+            page, headers = self._page(repos, params, base_url, path)
+            return 200, headers, page
+
+        if path == "/search/commits":
+            return self._search(params, base_url, path)
+
+        if re.fullmatch(r"/users/[^/]+/events", path):
+            return 200, {}, []
+
+        m = re.fullmatch(r"/repos/([^/]+/[^/]+)(/.*)?", path)
+        if not m or m.group(1) not in self.repo_names:
+            return 404, {}, {"message": "Not Found"}
+        repo, rest = m.group(1), m.group(2) or ""
+        commits = self.commits_for(repo)
+
+        if rest == "":
+            return 200, {}, {"full_name": repo, "default_branch": "main",
+                             "pushed_at": commits[0]["commit"]["author"]["date"] if commits else None}
+        if rest == "/branches":
+            page, headers = self._page([{"name": "main", "commit": {"sha": commits[0]["sha"]}}], params, base_url, path)
+            return 200, headers, page
+        if rest == "/commits":
+            since, until = params.get("since", ""), params.get("until", "~")
+            author = params.get("author")
+            if author and author.lower() != SYNTH_USER:
+                return 200, {}, []
+            matching = [c for c in commits if since <= c["commit"]["author"]["date"] < until]
+            page, headers = self._page(matching, params, base_url, path)
+            return 200, headers, page
+        return 404, {}, {"message": "Not Found"}
+
+    def _search(self, params, base_url, path):
+        q = params.get("q", "")
+        author = re.search(r"author:(\S+)", q)
+        dates = re.search(r"committer-date:(\d{4}-\d{2}-\d{2})\.\.(\d{4}-\d{2}-\d{2})", q)
+        if author and author.group(1).lower() != SYNTH_USER:
+            items = []
+        else:
+            lo, hi = (dates.group(1), dates.group(2) + "~") if dates else ("", "~")
+            items = [
+                dict(c, repository={"full_name": repo})
+                for repo in self.repo_names for c in self.commits_for(repo)
+                if lo <= c["commit"]["author"]["date"] < hi
+            ]
+            items.sort(key=lambda c: c["commit"]["author"]["date"], reverse=True)
+        total = len(items)
+        page, headers = self._page(items[:1000], params, base_url, path)
+        return 200, headers, {"total_count": total, "incomplete_results": False, "items": page}
+
+    def _chat(self, body):
+        request = json.loads(body or b"{}")
+        prompt = "".join(m.get("content", "") for m in request.get("messages", []))
+        input_part = prompt.split("Output JSON Format")[0]
+        dates = sorted(set(re.findall(r"\b\d{4}-\d{2}-\d{2}\b", input_part)))
+        entries = [{
+            "date": d,
+            "description": f"I worked on the project features and fixes committed on {d}.",
+            "activity_code": "4.2",
+            "problem": "",
+            "solution": "",
+        } for d in dates]
+        content = json.dumps({"entries": entries})
+        completion_tokens = len(content) // 4
+        prompt_tokens = len(prompt) // 4
+        return 200, {}, {
+            "id": "chatcmpl-stub-" + hashlib.sha1(prompt.encode()).hexdigest()[:12],
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+# --- CASSETTES (record / replay) ---
+class Cassette:
+    """
+    Recorded interactions, keyed by _request_key(). A POST whose exact body was
+    never recorded gets the recorded replies for its path in rotation, so a load
+    test with new prompts still receives realistic Groq responses.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.interactions = {}
+        self._by_path = {}
+        self._rotation = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for item in json.load(f).get("interactions", []):
+                    self._index(item)
+
+    def _index(self, item):
+        self.interactions[item["key"]] = item
+        self._by_path.setdefault(f"{item['method']} {item['path']}", []).append(item)
+
+    def lookup(self, method, path, key):
+        with self._lock:
+            item = self.interactions.get(key)
+            if item is None and method == "POST":
+                candidates = self._by_path.get(f"{method} {path}", [])
+                if candidates:
+                    n = self._rotation.get(path, 0)
+                    self._rotation[path] = n + 1
+                    item = candidates[n % len(candidates)]
+            return item
+
+    def add(self, item):
+        with self._lock:
+            self._index(item)
+            tmp = self.path + ".tmp"
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"interactions": list(self.interactions.values())}, f, indent=1)
+            os.replace(tmp, self.path)
+
+
+class ReplayBackend:
+    def __init__(self, cassette):
+        self.cassette = cassette
+
+    def handle(self, method, path, params, body, base_url, key):
+        item = self.cassette.lookup(method, path, key)
+        if item is None:
+            return 404, {}, {"message": f"Not recorded: {key}"}
+        headers = dict(item.get("headers", {}))
+        if "Link" in headers:
+            headers["Link"] = headers["Link"].replace(GITHUB_UPSTREAM, base_url)
+        return item["status"], headers, item["body"]
+
+
+class RecordBackend:
+    def __init__(self, cassette, github_upstream=GITHUB_UPSTREAM, groq_upstream=GROQ_UPSTREAM):
+        self.cassette = cassette
+        self.github_upstream = github_upstream
+        self.groq_upstream = groq_upstream
+
+    def handle(self, method, path, query, body, request_headers, key):
+        upstream = self.groq_upstream if _is_groq(path) else self.github_upstream
+        url = upstream + path + (f"?{query}" if query else "")
+        forward = {k: v for k, v in request_headers.items()
+                   if k.lower() in ("authorization", "accept", "content-type", "user-agent")}
+        req = urllib.request.Request(url, data=body or None, method=method, headers=forward)
+        try:
+            with urllib.request.urlopen(req, timeout=120) as resp:
+                status, raw, headers = resp.status, resp.read(), resp.headers
+        except urllib.error.HTTPError as e:
+            status, raw, headers = e.code, e.read(), e.headers
+
+        kept = {k: v for k, v in headers.items() if k.lower() in RECORDED_HEADERS or k.lower().startswith("x-ratelimit")}
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            payload = {"message": raw.decode(errors="replace")}
+        self.cassette.add({"key": key, "method": method, "path": path, "status": status,
+                           "headers": kept, "body": payload})
+        return status, kept, payload
+
+
+# --- HTTP ---
+class StubHandler(BaseHTTPRequestHandler):
+    # Set by make_server()
+    mode = "synthetic"
+    backend = None
+    faults = FaultPlan()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass # One line per request drowns a load test
+
+    def _send(self, status, headers, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            if k.lower() not in ("content-type", "content-length", "transfer-encoding", "connection"):
+                self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        split = urlsplit(self.path)
+        path, query = split.path.rstrip("/") or "/", split.query
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        key = _request_key(method, path, query, body if method == "POST" else b"")
+        groq = _is_groq(path)
+        base_url = f"http://{self.headers.get('Host', f'{DEFAULT_HOST}:{DEFAULT_PORT}')}"
+
+        attempt = self.faults.next_attempt(key)
+        self.faults.delay(key, attempt)
+
+        quota = self.faults.take_quota()
+        extra = {}
+        if quota:
+            limit, remaining, reset, allowed = quota
+            extra = rate_limit_headers(groq, limit, remaining, reset)
+            if not allowed:
+                extra["Retry-After"] = str(max(1, reset - int(time.time())))
+                # GitHub reports an exhausted primary limit as 403; Groq as 429
+                return self._send(429 if groq else 403, extra, error_body(groq, 429 if groq else 403))
+
+        fault = self.faults.injected_fault(key, attempt)
+        if fault:
+            if fault == 429:
+                extra["Retry-After"] = "1"
+            return self._send(fault, extra, error_body(groq, fault))
+
+        if self.mode == "record":
+            status, headers, payload = self.backend.handle(method, path, query, body, dict(self.headers), key)
+        elif self.mode == "replay":
+            status, headers, payload = self.backend.handle(method, path, dict(parse_qsl(query)), body, base_url, key)
+        else:
+            status, headers, payload = self.backend.handle(method, path, dict(parse_qsl(query)), body, base_url)
+        self._send(status, {**headers, **extra}, payload)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+def make_server(mode="synthetic", host=DEFAULT_HOST, port=DEFAULT_PORT, cassette=None, faults=None, **synthetic):
+    """Builds (but does not start) the server; port=0 picks a free port. Used by benchmarks too."""
+    if mode == "synthetic":
+        backend = SyntheticBackend(seed=faults.seed if faults else 0, **synthetic)
+    elif mode == "replay":
+        backend = ReplayBackend(Cassette(cassette))
+    elif mode == "record":
+        backend = RecordBackend(Cassette(cassette))
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
+
+    handler = type("BoundStubHandler", (StubHandler,), {
+        "mode": mode, "backend": backend, "faults": faults or FaultPlan(),
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_in_thread(server):
+    """Runs `server` on a daemon thread; returns its base URL."""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline GitHub/Groq stand-in for load tests.")
+    parser.add_argument("mode", choices=["synthetic", "replay", "record"])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cassette", default="cassettes/recording.json", help="Cassette file (replay/record).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 5xx.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with a 429.")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per window before 403/429 (0 = off).")
+    parser.add_argument("--window-s", type=int, default=60)
+    parser.add_argument("--repos", type=int, default=10, help="synthetic: number of repositories")
+    parser.add_argument("--commits", type=int, default=500, help="synthetic: commits per repository")
+    parser.add_argument("--start", default="2025-01-01", help="synthetic: first commit day")
+    parser.add_argument("--end", default="2025-06-30", help="synthetic: last commit day")
+    args = parser.parse_args()
+
+    faults = FaultPlan(args.seed, args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate,
+                       args.rate_limit, args.window_s)
+    synthetic = {"repos": args.repos, "commits": args.commits, "start": args.start, "end": args.end}
+    server = make_server(args.mode, args.host, args.port, args.cassette, faults,
+                         **(synthetic if args.mode == "synthetic" else {}))
+    base = f"http://{args.host}:{server.server_address[1]}"
+    print(f"{args.mode} stub listening on {base}")
+    print(f"  GITHUB_API_URL={base}\n  GROQ_BASE_URL={base}")
+    if args.mode == "synthetic":
+        print(f"  GitHub user: {SYNTH_USER} ({args.repos} repos x {args.commits} commits)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
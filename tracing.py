@@ -0,0 +1,168 @@
+"""
+Lightweight tracing for the Git pipeline and the Excel fill.
+
+A run starts a Trace with start() and ends it with stop(). While it is active,
+library code records into it through the module-level helpers:
+
+    with tracing.span("http GET", path="/repos/x/commits"):   # timed region
+        ...
+    tracing.count("http_bytes", len(resp.content))            # counter
+    tracing.record("month sheet", t0, month="Jan 2025")       # region that began at perf_counter() t0
+
+and app.py marks its top-level stages with trace.phase("..."), which closes
+the previous phase, so stages of the long linear Streamlit block need no nested
+with-blocks; wrap the run in try/finally so stop() also runs when a stage raises.
+With no active trace every helper is a no-op. The active trace is process-wide
+(worker threads of the same run record into it), which suits this single-user
+local app.
+
+Traces export as JSON or as a Chrome trace (chrome://tracing, ui.perfetto.dev).
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+MAX_SPANS = 20000 # Beyond this, spans are only counted (counters still update)
+
+_active = None
+
+
+class Trace:
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self.t0 = time.perf_counter()
+        self.wall_s = None
+        self.spans = [] # (name, start_s, dur_s, thread_id, args), times relative to t0
+        self.counters = {}
+        self.dropped = 0
+        self._phase = None
+        self._lock = threading.Lock()
+
+    # --- Recording ---
+    def add_span(self, name, start, end, args=None):
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS:
+                self.dropped += 1
+                return
+            self.spans.append((name, start - self.t0, end - start, threading.get_ident(), args or {}))
+
+    @contextmanager
+    def span(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter(), args)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def phase(self, name=None):
+        """Ends the current phase and, if `name` is given, starts the next one."""
+        now = time.perf_counter()
+        if self._phase:
+            self.add_span(self._phase[0], self._phase[1], now, {"phase": True})
+        self._phase = (name, now) if name else None
+
+    def finish(self):
+        self.phase(None)
+        self.wall_s = time.perf_counter() - self.t0
+        return self
+
+    # --- Reporting ---
+    def phase_rows(self):
+        """One row per span name, in order of first appearance."""
+        wall = self.wall_s or (time.perf_counter() - self.t0)
+        rows = {}
+        for name, start, dur, _, args in self.spans:
+            row = rows.setdefault(name, {"Stage": name, "Kind": "phase" if args.get("phase") else "span",
+                                         "Calls": 0, "Total s": 0.0, "Max s": 0.0, "first": start})
+            row["Calls"] += 1
+            row["Total s"] += dur
+            row["Max s"] = max(row["Max s"], dur)
+            row["first"] = min(row["first"], start)
+        out = sorted(rows.values(), key=lambda r: r["first"])
+        for r in out:
+            del r["first"]
+            r["% of run"] = round(100 * r["Total s"] / wall, 1) if wall else 0.0
+            r["Total s"] = round(r["Total s"], 3)
+            r["Max s"] = round(r["Max s"], 3)
+        return out
+
+    def counter_rows(self):
+        rows = [{"Counter": k, "Value": v} for k, v in sorted(self.counters.items())]
+        if self.dropped:
+            rows.append({"Counter": "spans_dropped", "Value": self.dropped})
+        return rows
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "wall_s": self.wall_s,
+            "counters": dict(self.counters),
+            "stages": self.phase_rows(),
+            "spans": [{"name": n, "start_s": round(s, 6), "dur_s": round(d, 6), "thread": t, "args": a}
+                      for n, s, d, t, a in self.spans],
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2, default=str)
+
+    def to_chrome_trace(self):
+        """Trace Event Format: complete ("X") events, one track per thread, counters in metadata."""
+        threads = {}
+        events = []
+        for name, start, dur, tid, args in self.spans:
+            track = threads.setdefault(tid, len(threads) + 1)
+            events.append({"name": name, "cat": "phase" if args.get("phase") else "span", "ph": "X",
+                           "ts": round(start * 1e6, 1), "dur": round(dur * 1e6, 1),
+                           "pid": 1, "tid": track, "args": {k: str(v) for k, v in args.items()}})
+        for tid, track in threads.items():
+            label = "main" if track == 1 else f"worker {track - 1}"
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": track, "args": {"name": label}})
+        events.append({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.name}})
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms",
+                           "otherData": {"counters": self.counters, "wall_s": self.wall_s}}, default=str)
+
+
+# --- Module-level helpers (no-ops without an active trace) ---
+def start(name):
+    global _active
+    _active = Trace(name)
+    return _active
+
+
+def stop():
+    global _active
+    trace, _active = _active, None
+    return trace.finish() if trace else None
+
+
+def active():
+    return _active
+
+
+@contextmanager
+def span(name, **args):
+    trace = _active
+    if trace is None:
+        yield
+        return
+    with trace.span(name, **args):
+        yield
+
+
+def record(name, start, **args):
+    trace = _active
+    if trace is not None:
+        trace.add_span(name, start, time.perf_counter(), args)
+
+
+def count(name, n=1):
+    trace = _active
+    if trace is not None:
+        trace.count(name, n)
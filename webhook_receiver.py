@@ -0,0 +1,214 @@
+"""
+Local GitHub webhook receiver.
+
+Accepts push-event deliveries, checks their X-Hub-Signature-256 against
+WEBHOOK_SECRET, and appends the pushed commits to the local commit cache
+(commit_cache.py). Logs can then be generated in the app with
+"Use Cached Data", with no fetch step.
+
+Serve (point a GitHub webhook, or a tunnel such as `gh webhook forward`, at it):
+    python webhook_receiver.py serve [--port 8765] [--author <login>] [--record-dir webhook_payloads]
+
+Replay recorded payloads against a running receiver (signed with the same secret):
+    python webhook_receiver.py replay webhook_payloads/*.json [--url http://127.0.0.1:8765/webhook]
+
+WEBHOOK_SECRET and GITHUB_USERNAME are read from the environment / .env.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import commit_cache
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+WEBHOOK_PATH = "/webhook"
+MAX_BODY_BYTES = 25 * 1024 * 1024 # GitHub caps payloads at 25 MB
+# Delivery IDs are GUIDs; anything else (e.g. "../x") must not become a file name
+DELIVERY_ID = re.compile(r"[0-9A-Za-z-]{1,64}")
+
+# Parquet partitions are rewritten on append; one writer at a time
+_cache_lock = threading.Lock()
+
+
+def sign(secret, body):
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret, body, signature_header):
+    if not signature_header:
+        return False
+    return hmac.compare_digest(sign(secret, body), signature_header)
+
+
+def _utc_day(timestamp):
+    """Push timestamps carry the committer's offset ("...+05:30"); the cache uses the UTC day like the REST API."""
+    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%d")
+
+
+def push_commits(payload, author=None):
+    """The pushed commits as a cache-ready DataFrame (sha, date, repo, message)."""
+    repo = payload["repository"]["full_name"]
+    rows = []
+    for c in payload.get("commits", []):
+        if author:
+            login = (c.get("author") or {}).get("username") or ""
+            if login.lower() != author.lower():
+                continue
+        rows.append({"sha": c["id"], "date": _utc_day(c["timestamp"]), "repo": repo, "message": c["message"]})
+    return pd.DataFrame(rows, columns=commit_cache.COLUMNS)
+
+
+def ingest_push(payload, author=None):
+    commits = push_commits(payload, author)
+    if commits.empty:
+        return 0
+    with _cache_lock:
+        return commit_cache.append_commits(commits)
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    # Set by serve()
+    secret = ""
+    author = None
+    record_dir = None
+
+    def _reply(self, status, message):
+        body = json.dumps({"message": message}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, "ok")
+        else:
+            self._reply(404, "not found")
+
+    def do_POST(self):
+        if self.path != WEBHOOK_PATH:
+            return self._reply(404, "not found")
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            return self._reply(413 if length > 0 else 400, "bad payload size")
+        body = self.rfile.read(length)
+
+        if not verify_signature(self.secret, body, self.headers.get("X-Hub-Signature-256")):
+            return self._reply(401, "invalid signature")
+
+        event = self.headers.get("X-GitHub-Event", "")
+        if event == "ping":
+            return self._reply(200, "pong")
+        if event != "push":
+            return self._reply(202, f"ignored event '{event}'")
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return self._reply(400, "invalid JSON")
+
+        if self.record_dir:
+            delivery = self.headers.get("X-GitHub-Delivery") or ""
+            if not DELIVERY_ID.fullmatch(delivery):
+                delivery = datetime.now().strftime("%Y%m%d%H%M%S%f")
+            os.makedirs(self.record_dir, exist_ok=True)
+            with open(os.path.join(self.record_dir, f"{delivery}.json"), "wb") as f:
+                f.write(body)
+
+        try:
+            added = ingest_push(payload, self.author)
+        except (KeyError, TypeError, ValueError) as e:
+            return self._reply(400, f"malformed push payload: {e}")
+        repo = payload.get("repository", {}).get("full_name", "?")
+        print(f"push {repo}: {len(payload.get('commits', []))} commit(s), {added} new in cache")
+        self._reply(200, f"{added} commit(s) added")
+
+
+def serve(host, port, secret, author=None, record_dir=None):
+    WebhookHandler.secret = secret
+    WebhookHandler.author = author
+    WebhookHandler.record_dir = record_dir
+    server = ThreadingHTTPServer((host, port), WebhookHandler)
+    print(f"Listening on http://{host}:{port}{WEBHOOK_PATH} (cache: {commit_cache.CACHE_DIR}/)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return server
+
+
+def replay(paths, url, secret):
+    """POSTs recorded push payloads to a receiver, signed like GitHub would. Returns the failure count."""
+    failures = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            body = f.read()
+        req = urllib.request.Request(url, data=body, method="POST", headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": "push",
+            "X-GitHub-Delivery": os.path.splitext(os.path.basename(path))[0],
+            "X-Hub-Signature-256": sign(secret, body),
+        })
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                print(f"{path}: {resp.status} {json.loads(resp.read())['message']}")
+        except urllib.error.HTTPError as e:
+            failures += 1
+            print(f"{path}: {e.code} {e.read().decode(errors='replace')}")
+        except urllib.error.URLError as e:
+            failures += 1 # Receiver not running, wrong URL...
+            print(f"{path}: {e.reason}")
+    return failures
+
+
+def main():
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    parser = argparse.ArgumentParser(description="Receive GitHub push webhooks into the local commit cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Run the receiver.")
+    p_serve.add_argument("--host", default=DEFAULT_HOST)
+    p_serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p_serve.add_argument("--author", default=os.getenv("GITHUB_USERNAME", ""),
+                         help="Only keep commits by this GitHub login (default: GITHUB_USERNAME; empty = everyone).")
+    p_serve.add_argument("--record-dir", help="Also save every push payload here, for later replay.")
+
+    p_replay = sub.add_parser("replay", help="Send recorded payloads to a running receiver.")
+    p_replay.add_argument("paths", nargs="+")
+    p_replay.add_argument("--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}{WEBHOOK_PATH}")
+
+    args = parser.parse_args()
+    secret = os.getenv("WEBHOOK_SECRET", "")
+    if not secret:
+        sys.exit("WEBHOOK_SECRET is not set; refusing to accept unsigned webhooks.")
+
+    if args.command == "serve":
+        serve(args.host, args.port, secret, args.author or None, args.record_dir)
+    else:
+        sys.exit(1 if replay(args.paths, args.url, secret) else 0)
+
+
+if __name__ == "__main__":
+    main()